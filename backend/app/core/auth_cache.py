@@ -0,0 +1,19 @@
+from app.core.config import settings
+from app.services.cache import TTLCache
+
+# Usuário (com perfil) já carregado, por id. Os objetos ficam desanexados
+# da Session e são compartilhados entre requisições: trate como somente leitura.
+# A chave é o id (não o "sub" do token) para que invalidar não precise de mapa reverso.
+principal_cache = TTLCache("principals", settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# user_id -> token_version, para as rotas que só precisam do id (get_current_user_id)
+token_version_cache = TTLCache("token_versions", settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+def cache_principal(user):
+    principal_cache.set(user.id, user)
+    token_version_cache.set(user.id, user.token_version)
+
+def invalidate_principal(user_id: int):
+    """Chamar sempre que o usuário ou o perfil dele mudar."""
+    principal_cache.delete(user_id)
+    token_version_cache.delete(user_id)
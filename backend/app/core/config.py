@@ -4,11 +4,75 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "NutriAgent"
     DATABASE_URL: str
 
+    # Pool de conexões do banco (por worker)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0 # Segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800 # Recria conexões mais velhas que isso (segundos)
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000 # 0 = sem limite
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Argon2: custos do hash e pool dedicado para hash/verificação
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536 # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64 # Acima disso responde 503 em vez de enfileirar
+
+    # Cache do usuário autenticado (evita 1-2 queries por requisição)
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
     GEMINI_API_KEY: str
+    GEMINI_MODEL: str = "gemini-flash-latest"
+
+    # Cliente HTTP da IA (pool compartilhado entre todas as requisições)
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 64 # Chamadas simultâneas para o Google
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 120.0 # Gerar 7 dias demora
+
+    # Cache de planos alimentares (chave = prompt normalizado)
+    PLAN_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    PLAN_CACHE_MAX_ENTRIES: int = 1000
+    PLAN_CACHE_DB_ENABLED: bool = False # Camada extra no Postgres, compartilhada entre workers
+    PLAN_CACHE_WEIGHT_BUCKET_KG: float = 1.0
+    PLAN_CACHE_CALORIES_BUCKET: int = 50
+
+    # Camada em memória na frente da tabela food_cache
+    FOOD_CACHE_HOT_MAX_ENTRIES: int = 5000
+    FOOD_CACHE_HOT_TTL_SECONDS: int = 60 * 60
+    FOOD_CACHE_WARM_ROWS: int = 500 # Linhas mais usadas carregadas no startup
+    FOOD_CACHE_HIT_FLUSH_SECONDS: float = 60.0 # hit_count é somado em memória e gravado em lote
+    FOOD_CACHE_HIT_FLUSH_THRESHOLD: int = 500 # ...ou antes, quando acumular tantos acertos
+
+    # Índice de despensa ("o que dá pra cozinhar" com as receitas salvas)
+    PANTRY_INDEX_TTL_SECONDS: int = 300
+    PANTRY_INDEX_MAX_ENTRIES: int = 1000
+    PANTRY_MIN_COVERAGE: float = 1.0 # Em /ai/recipe-by-ingredients, só evita a IA se a receita salva estiver completa
+    PANTRY_MIN_PANTRY_COVERAGE: float = 0.5 # ...e se ela usar ao menos metade do que o usuário informou
+    PANTRY_MIN_MATCHED: int = 2 # ...e casar pelo menos tantos ingredientes (fora os básicos)
+
+    # Fila de jobs de IA (tabela ai_jobs). 0 workers = esta instância só enfileira
+    AI_JOB_WORKERS: int = 2
+    AI_JOBS_PER_USER: int = 2 # Jobs na fila/rodando ao mesmo tempo por usuário
+    AI_JOB_MAX_ATTEMPTS: int = 2
+    AI_JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    AI_JOB_HEARTBEAT_SECONDS: int = 30 # Intervalo em que o worker avisa que o job ainda está rodando
+    AI_JOB_STALE_SECONDS: int = 120 # Job "running" sem heartbeat há mais tempo que isso volta para a fila (worker caiu)
+    AI_JOB_MAX_WAIT_SECONDS: int = 30 # Long-poll do GET /ai/jobs/{id}
+
+    # Fan-out: planos com mais de 1 dia são gerados dia a dia em paralelo
+    PLAN_FANOUT_ENABLED: bool = True
+    PLAN_FANOUT_CONCURRENCY: int = 4 # Chamadas simultâneas por plano
+    PLAN_DAY_RETRIES: int = 2
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -16,4 +80,4 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
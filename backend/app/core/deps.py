@@ -2,41 +2,89 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
-from app.crud.user import get_user_by_email
+from app.crud.user import get_token_version, get_user_with_profile, get_user_with_profile_by_email
+from app.core.auth_cache import principal_cache, token_version_cache, cache_principal
 
 # Define que o token vem do header "Authorization: Bearer <token>" e aponta para a URL de login
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _decode_token(token: str) -> dict:
     try:
         # Decodifica o token usando a nossa SECRET_KEY
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    # Busca o usuário no banco
-    user = get_user_by_email(db, email=email)
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    payload = _decode_token(token)
+    subject = str(payload["sub"])
+
+    # Tokens novos trazem o id no "sub"; os antigos, o email (sempre resolvidos no banco)
+    user = principal_cache.get(int(subject)) if subject.isdigit() else None
     if user is None:
+        if subject.isdigit():
+            user = await get_user_with_profile(db, user_id=int(subject))
+        else:
+            user = await get_user_with_profile_by_email(db, email=subject)
+        if user is None:
+            raise credentials_exception
+
+        # Desanexa da Session antes de guardar: o objeto será lido por outras requisições
+        db.expunge(user)
+        if user.profile is not None:
+            db.expunge(user.profile)
+        cache_principal(user)
+
+    # Tokens sem versão (antigos) valem como versão 0
+    if payload.get("ver", 0) != user.token_version:
         raise credentials_exception
     return user
 
-def get_current_active_superuser(
+async def get_current_user_id(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db)
+) -> int:
+    """
+    Para rotas que só precisam do id: lê do token e confere só o token_version,
+    que fica em cache (uma query pela chave primária quando não está).
+    """
+    payload = _decode_token(token)
+    subject = str(payload["sub"])
+    if not subject.isdigit():
+        # Token antigo (sub = email): precisa resolver o usuário
+        user = await get_current_user(token, db)
+        return user.id
+
+    user_id = int(subject)
+    version = token_version_cache.get(user_id)
+    if version is None:
+        version = await get_token_version(db, user_id)
+        if version is None:
+            raise credentials_exception
+        token_version_cache.set(user_id, version)
+
+    if payload.get("ver", 0) != version:
+        raise credentials_exception
+    return user_id
+
+async def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_superuser:
@@ -44,4 +92,4 @@ def get_current_active_superuser(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges",
         )
-    return current_user
\ No newline at end of file
+    return current_user
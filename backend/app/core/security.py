@@ -1,16 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from app.core.config import settings
 
-# Configura o algoritmo Bcrypt
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Configura o algoritmo Argon2 (mudar os custos no .env faz o hash ser refeito no próximo login)
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# O Argon2 libera o GIL, então threads dedicadas bastam. Fica separado do threadpool
+# do FastAPI para um pico de logins não travar o resto da API.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2")
+_pending_hashes = 0
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def _run_hasher(func, *args):
+    global _pending_hashes
+    if _pending_hashes >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
+    _pending_hashes += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, partial(func, *args))
+    finally:
+        _pending_hashes -= 1
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hasher(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Confere a senha e devolve um novo hash se os parâmetros do Argon2 mudaram (senão None)."""
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await _run_hasher(pwd_context.hash, password)
+
+def shutdown_password_hasher():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -21,4 +57,4 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
@@ -1,20 +1,44 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
 from app.schemas.ingredient import IngredientCreate
 
-def create_ingredient(db: Session, ingredient: IngredientCreate):
+async def _add_recipe_calories(db: AsyncSession, recipe_id: int, delta: float):
+    # Ajuste atômico no banco: duas requisições simultâneas não perdem a soma uma da outra
+    await db.execute(
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(calories=func.coalesce(Recipe.calories, 0) + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+async def create_ingredient(db: AsyncSession, ingredient: IngredientCreate):
     db_ingredient = Ingredient(**ingredient.model_dump())
     db.add(db_ingredient)
-    db.commit()
-    db.refresh(db_ingredient)
+    if db_ingredient.calories:
+        await _add_recipe_calories(db, db_ingredient.recipe_id, db_ingredient.calories)
+    await db.commit()
+    await db.refresh(db_ingredient)
     return db_ingredient
 
-def get_ingredients_by_recipe(db: Session, recipe_id: int):
-    return db.query(Ingredient).filter(Ingredient.recipe_id == recipe_id).all()
+async def get_ingredient(db: AsyncSession, ingredient_id: int):
+    return await db.get(Ingredient, ingredient_id)
+
+async def get_ingredients_by_recipe(db: AsyncSession, recipe_id: int):
+    result = await db.execute(select(Ingredient).where(Ingredient.recipe_id == recipe_id))
+    return result.scalars().all()
 
-def delete_ingredient(db: Session, ingredient_id: int):
-    db_ingredient = db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
-    if db_ingredient:
-        db.delete(db_ingredient)
-        db.commit()
-    return db_ingredient
\ No newline at end of file
+async def delete_ingredient(db: AsyncSession, ingredient_id: int):
+    row = (await db.execute(
+        delete(Ingredient)
+        .where(Ingredient.id == ingredient_id)
+        .returning(Ingredient.id, Ingredient.recipe_id, Ingredient.calories)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is None:
+        return None
+    if row.calories:
+        await _add_recipe_calories(db, row.recipe_id, -row.calories)
+    await db.commit()
+    return row
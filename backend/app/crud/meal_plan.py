@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from app.models.meal_plan import MealPlan
+
+async def create_meal_plan(db: AsyncSession, user_id: int, cache_key: str, days: int, variety: str, plan: dict):
+    db_plan = MealPlan(user_id=user_id, cache_key=cache_key, days=days, variety=variety, plan=plan)
+    db.add(db_plan)
+    await db.commit()
+    return db_plan
+
+async def get_meal_plan(db: AsyncSession, plan_id: int, user_id: int):
+    result = await db.execute(select(MealPlan).where(MealPlan.id == plan_id, MealPlan.user_id == user_id))
+    return result.scalars().first()
+
+async def get_latest_by_key(db: AsyncSession, user_id: int, cache_key: str, max_age_seconds: int):
+    """Plano mais recente do usuário gerado com o mesmo perfil e opções, se tiver menos de max_age_seconds."""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    result = await db.execute(
+        select(MealPlan)
+        .where(MealPlan.user_id == user_id, MealPlan.cache_key == cache_key, MealPlan.created_at >= cutoff)
+        .order_by(MealPlan.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def get_meal_plans(db: AsyncSession, user_id: int, limit: int = 20, before_id: int | None = None):
+    # Listagem sem o JSON do plano (pode ter dezenas de KB por linha)
+    query = select(MealPlan).options(defer(MealPlan.plan)).where(MealPlan.user_id == user_id)
+    if before_id is not None:
+        query = query.where(MealPlan.id < before_id)
+    result = await db.execute(query.order_by(MealPlan.id.desc()).limit(limit))
+    return result.scalars().all()
+
+async def delete_meal_plan(db: AsyncSession, plan_id: int, user_id: int) -> bool:
+    result = await db.execute(
+        delete(MealPlan)
+        .where(MealPlan.id == plan_id, MealPlan.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount > 0
@@ -1,9 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.profile import Profile
 from app.schemas.profile import ProfileCreate
+from app.core.auth_cache import invalidate_principal
 
-def get_profile_by_user_id(db: Session, user_id: int):
-    return db.query(Profile).filter(Profile.user_id == user_id).first()
+async def get_profile_by_user_id(db: AsyncSession, user_id: int):
+    result = await db.execute(select(Profile).where(Profile.user_id == user_id))
+    return result.scalars().first()
 
 def calculate_metrics(profile_data: ProfileCreate):
     """Calcula BMR e Meta Calórica automaticamente."""
@@ -39,7 +42,7 @@ def calculate_metrics(profile_data: ProfileCreate):
         
     return bmr, round(daily_calories)
 
-def create_or_update_profile(db: Session, profile: ProfileCreate, user_id: int):
+async def create_or_update_profile(db: AsyncSession, profile: ProfileCreate, user_id: int):
     # 1. Calcula métricas
     bmr, daily = calculate_metrics(profile)
     
@@ -52,7 +55,7 @@ def create_or_update_profile(db: Session, profile: ProfileCreate, user_id: int):
     data['daily_calories'] = daily
     
     # 3. Busca perfil existente
-    db_profile = get_profile_by_user_id(db, user_id)
+    db_profile = await get_profile_by_user_id(db, user_id)
     
     if db_profile:
         # ATUALIZAÇÃO DINÂMICA (Aqui estava o problema antes!)
@@ -65,6 +68,7 @@ def create_or_update_profile(db: Session, profile: ProfileCreate, user_id: int):
         db_profile = Profile(**data, user_id=user_id)
         db.add(db_profile)
     
-    db.commit()
-    db.refresh(db_profile)
+    await db.commit()
+    await db.refresh(db_profile)
+    invalidate_principal(user_id)
     return db_profile
\ No newline at end of file
@@ -1,49 +1,135 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.recipe import Recipe
 from app.schemas.recipe import RecipeCreate
 from app.models.ingredient import Ingredient
+from app.services.pantry import invalidate_pantry
 
-def create_recipe(db: Session, recipe: RecipeCreate, user_id: int):
-    recipe_data = recipe.model_dump()
-    
-    ingredients_data = recipe_data.pop("ingredients", [])
+async def create_recipe(db: AsyncSession, recipe: RecipeCreate, user_id: int):
+    db_recipes = await create_recipes(db, [recipe], user_id)
+    return db_recipes[0]
 
-    db_recipe = Recipe(**recipe_data, user_id=user_id)
-    
-    db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
+async def create_recipes(db: AsyncSession, recipes: list[RecipeCreate], user_id: int):
+    """
+    Cria várias receitas com os ingredientes em uma transação:
+    um INSERT ... RETURNING para as receitas e outro para todos os ingredientes.
+    """
+    recipes_data = [recipe.model_dump() for recipe in recipes]
+    ingredients_data = [data.pop("ingredients", []) for data in recipes_data]
+    for data, ingredients in zip(recipes_data, ingredients_data):
+        data["user_id"] = user_id
+        # Com calorias nos ingredientes, o total da receita é a soma deles (mantida depois por crud/ingredient).
+        # Sem elas (o formulário e a IA mandam só o total), vale o valor informado
+        total = sum(ing.get("calories") or 0 for ing in ingredients)
+        if total:
+            data["calories"] = total
 
-    for ing in ingredients_data:
-        db_ingredient = Ingredient(**ing, recipe_id=db_recipe.id)
-        db.add(db_ingredient)
-    
-    db.commit()
-    db.refresh(db_recipe)
+    # sort_by_parameter_order garante que as linhas voltam na ordem do payload
+    db_recipes = (await db.scalars(
+        insert(Recipe).returning(Recipe, sort_by_parameter_order=True),
+        recipes_data,
+    )).all()
 
-    return db_recipe
+    ingredient_rows = [
+        {**ing, "recipe_id": db_recipe.id}
+        for db_recipe, ingredients in zip(db_recipes, ingredients_data)
+        for ing in ingredients
+    ]
+    by_recipe = {db_recipe.id: [] for db_recipe in db_recipes}
+    if ingredient_rows:
+        db_ingredients = await db.scalars(
+            insert(Ingredient).returning(Ingredient, sort_by_parameter_order=True),
+            ingredient_rows,
+        )
+        for db_ingredient in db_ingredients:
+            by_recipe[db_ingredient.recipe_id].append(db_ingredient)
+
+    # Preenche o relacionamento sem marcar as receitas como alteradas (nada de lazy load depois)
+    for db_recipe in db_recipes:
+        set_committed_value(db_recipe, "ingredients", by_recipe[db_recipe.id])
+
+    await db.commit()
+    invalidate_pantry(user_id)
+    return db_recipes
+
+async def get_recipes(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    category: str | None = None,
+    preparation_method: str | None = None,
+    is_favorite: bool | None = None,
+):
+    """Lista receitas em ordem de id. Com `after_id` a página começa depois desse id (keyset)."""
+    query = (
+        select(Recipe)
+        .options(selectinload(Recipe.ingredients))
+        .where(Recipe.user_id == user_id)
+    )
+    if after_id is not None:
+        query = query.where(Recipe.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    if category is not None:
+        query = query.where(Recipe.category == category)
+    if preparation_method is not None:
+        query = query.where(Recipe.preparation_method == preparation_method)
+    if is_favorite is not None:
+        query = query.where(Recipe.is_favorite == is_favorite)
 
-def get_recipes(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Recipe).filter(Recipe.user_id == user_id).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(Recipe.id).limit(limit))
+    return result.scalars().all()
 
-def get_recipe(db: Session, recipe_id: int):
-    return db.query(Recipe).filter(Recipe.id == recipe_id).first()
+async def search_recipes(db: AsyncSession, user_id: int, q: str, limit: int = 20):
+    """
+    Busca textual (português) em título, ingredientes e descrição, com fallback
+    de similaridade por trigramas no título para erros de digitação.
+    """
+    ts_query = func.websearch_to_tsquery("portuguese", q)
+    rank = func.ts_rank_cd(Recipe.search_vector, ts_query) + func.similarity(Recipe.title, q)
+
+    result = await db.execute(
+        select(Recipe)
+        .options(selectinload(Recipe.ingredients))
+        .where(
+            Recipe.user_id == user_id,
+            or_(Recipe.search_vector.bool_op("@@")(ts_query), Recipe.title.bool_op("%")(q)),
+        )
+        .order_by(rank.desc(), Recipe.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_recipe(db: AsyncSession, recipe_id: int):
+    result = await db.execute(
+        select(Recipe).options(selectinload(Recipe.ingredients)).where(Recipe.id == recipe_id)
+    )
+    return result.scalars().first()
+
+async def update_recipe(db: AsyncSession, db_recipe: Recipe, recipe_data: dict):
+    # Calorias só são derivadas (e não editáveis) quando os ingredientes trazem calorias
+    ignored = {'ingredients'}
+    if any(ing.calories for ing in db_recipe.ingredients):
+        ignored.add('calories')
 
-def update_recipe(db: Session, db_recipe: Recipe, recipe_data: dict):
     # Atualiza apenas os campos que vieram
     for key, value in recipe_data.items():
         # Ignora ingredientes na edição simples para não quebrar
-        if key != 'ingredients' and hasattr(db_recipe, key):
+        if key not in ignored and hasattr(db_recipe, key):
             setattr(db_recipe, key, value)
             
     db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
+    await db.commit()
     return db_recipe
 
-def delete_recipe(db: Session, recipe_id: int):
-    db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+async def delete_recipe(db: AsyncSession, recipe_id: int):
+    db_recipe = await db.get(Recipe, recipe_id)
     if db_recipe:
-        db.delete(db_recipe)
-        db.commit()
-    return db_recipe
\ No newline at end of file
+        await db.delete(db_recipe)
+        await db.commit()
+        invalidate_pantry(db_recipe.user_id)
+    return db_recipe
@@ -0,0 +1,96 @@
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.shopping import ShoppingList, ShoppingItem
+
+def encode_cursor(db_list) -> str:
+    return f"{db_list.created_at.isoformat()}_{db_list.id}"
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverso do encode_cursor. Levanta ValueError se o cursor for inválido."""
+    created_at, _, list_id = cursor.rpartition("_")
+    return datetime.fromisoformat(created_at), int(list_id)
+
+def _page(query, user_id: int, limit: int, before: tuple[datetime, int] | None):
+    # Keyset em (created_at, id) decrescente: o id desempata listas criadas no mesmo instante
+    query = query.where(ShoppingList.user_id == user_id)
+    if before is not None:
+        query = query.where(tuple_(ShoppingList.created_at, ShoppingList.id) < before)
+    return query.order_by(ShoppingList.created_at.desc(), ShoppingList.id.desc()).limit(limit)
+
+async def get_lists(db: AsyncSession, user_id: int, limit: int = 20, before: tuple[datetime, int] | None = None):
+    result = await db.execute(
+        _page(select(ShoppingList).options(selectinload(ShoppingList.items)), user_id, limit, before)
+    )
+    return result.scalars().all()
+
+async def get_list_summaries(db: AsyncSession, user_id: int, limit: int = 20, before: tuple[datetime, int] | None = None):
+    """Listas sem os itens, só com as contagens, numa única query agregada."""
+    query = (
+        select(
+            ShoppingList.id,
+            ShoppingList.title,
+            ShoppingList.created_at,
+            func.count(ShoppingItem.id).label("item_count"),
+            func.count(ShoppingItem.id).filter(ShoppingItem.checked.is_(True)).label("checked_count"),
+        )
+        .outerjoin(ShoppingItem, ShoppingItem.list_id == ShoppingList.id)
+        .group_by(ShoppingList.id)
+    )
+    result = await db.execute(_page(query, user_id, limit, before))
+    return result.all()
+
+async def create_list(db: AsyncSession, user_id: int, title: str, items: list[dict]):
+    """Cria a lista e todos os itens em uma transação: um INSERT ... RETURNING para cada tabela."""
+    db_list = (await db.scalars(
+        insert(ShoppingList).returning(ShoppingList),
+        [{"title": title, "user_id": user_id}],
+    )).one()
+
+    db_items = []
+    if items:
+        db_items = (await db.scalars(
+            insert(ShoppingItem).returning(ShoppingItem, sort_by_parameter_order=True),
+            [{**item, "list_id": db_list.id} for item in items],
+        )).all()
+    set_committed_value(db_list, "items", list(db_items))
+
+    await db.commit()
+    return db_list
+
+async def user_owns_list(db: AsyncSession, list_id: int, user_id: int) -> bool:
+    result = await db.execute(
+        select(ShoppingList.id).where(ShoppingList.id == list_id, ShoppingList.user_id == user_id)
+    )
+    return result.scalar() is not None
+
+async def apply_item_changes(
+    db: AsyncSession, list_id: int, check: set[int], uncheck: set[int], remove: set[int]
+) -> dict:
+    """
+    Marca, desmarca e remove itens da lista com no máximo dois comandos (UPDATE com CASE + DELETE)
+    e um commit. Ids que não são da lista são ignorados; remover tem prioridade sobre marcar.
+    """
+    check, uncheck = check - remove, uncheck - remove - check
+    updated = deleted = 0
+
+    if check or uncheck:
+        result = await db.execute(
+            update(ShoppingItem)
+            .where(ShoppingItem.list_id == list_id, ShoppingItem.id.in_(check | uncheck))
+            .values(checked=case((ShoppingItem.id.in_(check), True), else_=False))
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.rowcount
+    if remove:
+        result = await db.execute(
+            delete(ShoppingItem)
+            .where(ShoppingItem.list_id == list_id, ShoppingItem.id.in_(remove))
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.rowcount
+
+    await db.commit()
+    return {"updated": updated, "deleted": deleted}
@@ -1,13 +1,33 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import get_password_hash 
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password) 
+async def get_user_with_profile(db: AsyncSession, user_id: int):
+    # Busca pela chave primária, usuário e perfil em uma única query
+    result = await db.execute(select(User).options(joinedload(User.profile)).where(User.id == user_id))
+    return result.scalars().first()
+
+async def get_user_with_profile_by_email(db: AsyncSession, email: str):
+    # Usuário e perfil em uma única query (LEFT OUTER JOIN)
+    result = await db.execute(select(User).options(joinedload(User.profile)).where(User.email == email))
+    return result.scalars().first()
+
+async def get_token_version(db: AsyncSession, user_id: int) -> int | None:
+    return await db.scalar(select(User.token_version).where(User.id == user_id))
+
+async def revoke_tokens(db: AsyncSession, user_id: int):
+    await db.execute(update(User).where(User.id == user_id).values(token_version=User.token_version + 1))
+    await db.commit()
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await get_password_hash(user.password)
     
     db_user = User(
         email=user.email,
@@ -17,6 +37,6 @@ def create_user(db: Session, user: UserCreate):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
@@ -1,18 +1,45 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-    SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+def _async_database_url(url: str) -> str:
+    """Troca o driver da URL (postgres://, postgresql+psycopg://...) pelo asyncpg."""
+    scheme, rest = url.split("://", 1)
+    if scheme == "postgres" or scheme.split("+")[0] == "postgresql":
+        return f"postgresql+asyncpg://{rest}"
+    return url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = _async_database_url(settings.DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# statement_timeout é aplicado pelo Postgres em cada conexão do pool
+_server_settings = {}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    _server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
 
-def get_db():
-    db = SessionLocal()
-    try:
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"server_settings": _server_settings},
+)
+
+# expire_on_commit=False: os objetos continuam legíveis depois do commit sem novo SELECT
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def pool_status() -> dict:
+    """Números do pool deste worker, para dimensionar DB_POOL_SIZE/DB_MAX_OVERFLOW."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0), # O SQLAlchemy devolve negativo enquanto o pool não enche
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,11 +1,43 @@
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import users, auth, profiles, recipes, ingredients, admin, ai, shopping
+from sqlalchemy import text
+from app.routers import users, auth, profiles, recipes, ingredients, admin, ai, shopping, meal_plans
+from app.db.session import AsyncSessionLocal, engine, pool_status
+from app.services.llm import llm_client
+from app.services.food_cache import start_food_hit_flusher, stop_food_hit_flusher, warm_food_cache
+from app.core.security import shutdown_password_hasher
+from app.services.jobs import start_job_workers, stop_job_workers
+
+async def _warm_caches():
+    try:
+        async with AsyncSessionLocal() as db:
+            print(f"🔥 Cache de alimentos aquecido: {await warm_food_cache(db)} itens")
+    except Exception as e:
+        # Sem banco no startup a API sobe mesmo assim, só com o cache frio
+        print(f"❌ Erro ao aquecer cache: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abre o pool de conexões da IA uma única vez e fecha no shutdown
+    await llm_client.start()
+    await _warm_caches()
+    start_job_workers()
+    start_food_hit_flusher()
+    yield
+    await stop_job_workers()
+    await stop_food_hit_flusher()
+    await llm_client.close()
+    await engine.dispose()
+    shutdown_password_hasher()
 
 app = FastAPI(
     title="NutriAgent API",
     description="Backend com agente de IA para planejamento alimentar.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 origins = ["*"]
@@ -16,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Sem isso o navegador esconde o cursor das listas paginadas
 )
 
 app.include_router(users.router, prefix="/users", tags=["users"])
@@ -26,6 +59,7 @@ app.include_router(ingredients.router, prefix="/ingredients", tags=["ingredients
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(ai.router, prefix="/ai", tags=["ai"])
 app.include_router(shopping.router, prefix="/shopping", tags=["shopping"])
+app.include_router(meal_plans.router, prefix="/meal-plans", tags=["meal-plans"])
 
 @app.get("/")
 def read_root():
@@ -38,4 +72,20 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/db")
+async def health_check_db(ping: bool = True):
+    """Estado do pool de conexões. ping=false não ocupa conexão (útil com o pool esgotado)."""
+    result = {"status": "ok", "pool": pool_status()}
+    if ping:
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        except Exception as e:
+            result["status"] = "error"
+            result["detail"] = str(e)
+            return JSONResponse(status_code=503, content=result)
+    return result
\ No newline at end of file
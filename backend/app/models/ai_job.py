@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class AIJob(Base):
+    __tablename__ = "ai_jobs"
+    __table_args__ = (
+        # Fila: WHERE status = 'queued' ORDER BY created_at ... FOR UPDATE SKIP LOCKED
+        Index("ix_ai_jobs_status_created_at", "status", "created_at"),
+        # Limite por usuário: jobs ativos de um user_id
+        Index("ix_ai_jobs_user_id_status", "user_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    kind: Mapped[str] = mapped_column(String, nullable=False) # meal_plan, shopping_list
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued") # queued, running, done, failed
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    result: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True) # Renovado pelo worker enquanto o job roda
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
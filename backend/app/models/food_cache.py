@@ -1,11 +1,14 @@
-from sqlalchemy import Integer, String, Float
+from sqlalchemy import Integer, String, Float, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 class FoodCache(Base):
     __tablename__ = "food_cache"
+    # Um alimento por unidade base: "leite" em ml e "leite" em g são linhas diferentes
+    __table_args__ = (UniqueConstraint("name", "unit_type", name="uq_food_cache_name_unit"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False) # Ex: "Peito de Frango Grelhado"
-    calories_per_unit: Mapped[float] = mapped_column(Float, nullable=False) # Kcal por 1g ou 1 unidade
-    unit_type: Mapped[str] = mapped_column(String, nullable=False) # "g", "ml", "un"
\ No newline at end of file
+    name: Mapped[str] = mapped_column(String, nullable=False) # Normalizado: "peito de frango grelhado"
+    calories_per_unit: Mapped[float] = mapped_column(Float, nullable=False) # Kcal por 1 unidade base
+    unit_type: Mapped[str] = mapped_column(String, nullable=False) # Unidade base: "g", "ml", "un"
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True) # Usado para aquecer o cache em memória
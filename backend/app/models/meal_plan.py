@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class MealPlan(Base):
+    __tablename__ = "meal_plans"
+    __table_args__ = (
+        Index("ix_meal_plans_user_id_created_at", "user_id", "created_at"),
+        Index("ix_meal_plans_user_id_cache_key", "user_id", "cache_key"),
+        # Consultas de contenção no JSON (plan @> '{"days": [...]}')
+        Index("ix_meal_plans_plan", "plan", postgresql_using="gin", postgresql_ops={"plan": "jsonb_path_ops"}),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # Hash do perfil normalizado + opções no momento da geração (mesma chave do plan_cache)
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    days: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    variety: Mapped[str] = mapped_column(String, nullable=False, default="varied")
+    plan: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class PlanCache(Base):
+    __tablename__ = "plan_cache"
+
+    # SHA-256 do prompt normalizado
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    plan: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
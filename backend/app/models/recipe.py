@@ -1,9 +1,16 @@
-from sqlalchemy import Integer, String, Text, Float, ForeignKey, Boolean
+from sqlalchemy import Integer, String, Text, Float, ForeignKey, Boolean, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    # Paginação por cursor: WHERE user_id = ? AND id > ? ORDER BY id
+    __table_args__ = (
+        Index("ix_recipes_user_id_id", "user_id", "id"),
+        Index("ix_recipes_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_recipes_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -23,4 +30,8 @@ class Recipe(Base):
     preparation_method: Mapped[str] = mapped_column(String, nullable=True, default="fogao")
 
     category: Mapped[str] = mapped_column(String, nullable=True, default="almoco") # doce, salgado, almoco...
-    is_favorite: Mapped[bool] = mapped_column(Boolean, default=False)
\ No newline at end of file
+    is_favorite: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Título + ingredientes + descrição para a busca. Mantido por triggers no banco
+    # (ver migração add_recipe_search), a aplicação nunca escreve nele.
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
\ No newline at end of file
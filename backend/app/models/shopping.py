@@ -1,10 +1,12 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.db.base import Base
 
 class ShoppingList(Base):
     __tablename__ = "shopping_lists"
+    # Listagem paginada: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    __table_args__ = (Index("ix_shopping_lists_user_id_created_at", "user_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
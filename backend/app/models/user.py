@@ -12,6 +12,8 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Incrementar invalida todos os tokens já emitidos (logout em todos os dispositivos)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     weight_history = relationship("WeightHistory", back_populates="user")
 
     profile = relationship("Profile", back_populates="user", uselist=False)
@@ -1,10 +1,12 @@
 from datetime import datetime
-from sqlalchemy import Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 class WeightHistory(Base):
     __tablename__ = "weight_history"
+    # Histórico e série do gráfico: WHERE user_id = ? AND date BETWEEN ... ORDER BY date
+    __table_args__ = (Index("ix_weight_history_user_id_date", "user_id", "date"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
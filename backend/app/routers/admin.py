@@ -1,20 +1,29 @@
 from typing import List
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.schemas.user import UserResponse
 from app.models.user import User
 from app.core.deps import get_current_active_superuser
+from app.services.cache import cache_stats
 
 router = APIRouter()
 
 @router.get("/users", response_model=List[UserResponse])
-def read_all_users(
-    db: Session = Depends(get_db),
+async def read_all_users(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_superuser), # <--- A mágica aqui
     skip: int = 0,
     limit: int = 100,
 ):
     """(Admin Only) Lista todos os usuários do sistema."""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
\ No newline at end of file
+    result = await db.execute(select(User).offset(skip).limit(limit))
+    return result.scalars().all()
+
+@router.get("/cache-stats")
+async def read_cache_stats(
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """(Admin Only) Métricas de hit/miss dos caches da aplicação."""
+    return cache_stats()
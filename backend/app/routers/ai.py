@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Dict, Any
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
+from typing import List, Dict, Any, Literal, Optional
 
-from app.db.session import get_db
-from app.core.deps import get_current_user
+from app.db.session import get_async_db, AsyncSessionLocal
+from app.core.deps import get_current_user, get_current_user_id
 from app.models.user import User
-from app.models.shopping import ShoppingList, ShoppingItem
-from app.services.ai import generate_meal_plan, get_food_calories, generate_recipe_from_ingredients, generate_shopping_list_from_plan
+from app.crud import meal_plan as crud_meal_plan
+from app.services.ai import get_food_calories, get_foods_calories, generate_recipe_from_ingredients
+from app.services.ai import meal_plan_prompt_and_key, stream_meal_plan_days
+from app.services.plan_cache import get_cached_plan, save_cached_plan
+from app.services.pantry import find_recipes_by_pantry
+from app.schemas.recipe import RecipeResponse
+from app.core.config import settings
+from app.services.jobs import enqueue_job, get_job, wait_for_job
+# Alias: a rota /plan-to-shopping-list abaixo tem o mesmo nome e esconderia o serviço
+from app.services.meal_plans import create_shopping_list_from_plan as save_plan_shopping_list
+from app.services.meal_plans import get_or_generate_meal_plan, meal_plan_payload
 
 router = APIRouter()
 
@@ -19,68 +31,232 @@ class FoodQuery(BaseModel):
 
 class IngredientList(BaseModel):
     ingredients: List[str]
+    use_saved_recipes: bool = True # False = sempre pede uma receita nova para a IA
 
 class GeneratePlanRequest(BaseModel):
     days: int = 1
     variety: str = "varied" # varied ou repetitive
+    fresh: bool = False # True = ignora o cache e gera um plano novo
+    fan_out: Optional[bool] = None # None = usa o padrão do servidor (PLAN_FANOUT_ENABLED)
+
+class PlanToShoppingParams(BaseModel):
+    plan: Optional[Dict[str, Any]] = None
+    plan_id: Optional[int] = None # Plano salvo (ver /meal-plans), sem reenviar o JSON
+
+    @model_validator(mode="after")
+    def _plan_or_id(self):
+        if self.plan is None and self.plan_id is None:
+            raise ValueError("Informe plan ou plan_id")
+        return self
+
+class AIJobCreate(BaseModel):
+    kind: Literal["meal_plan", "shopping_list"]
+    params: Dict[str, Any] = {} # meal_plan: mesmos campos do GeneratePlanRequest; shopping_list: {"plan": {...}}
+
+class AIJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str # queued, running, done, failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+JOB_PARAMS = {"meal_plan": GeneratePlanRequest, "shopping_list": PlanToShoppingParams}
 
 # --- ROTAS ---
 
 @router.post("/generate-plan") # <--- A Rota que estava dando 404
-def generate_ai_plan(
+async def generate_ai_plan(
     data: GeneratePlanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    if not current_user.profile:
+    profile = current_user.profile
+    if not profile:
         raise HTTPException(status_code=400, detail="Perfil não encontrado.")
     
-    plan = generate_meal_plan(current_user.profile, days=data.days, variety_mode=data.variety)
+    db_plan = await get_or_generate_meal_plan(
+        db, current_user.id, profile, days=data.days, variety_mode=data.variety, fresh=data.fresh, fan_out=data.fan_out
+    )
     
-    if not plan:
+    if not db_plan:
         raise HTTPException(status_code=500, detail="Erro ao gerar plano com a IA.")
         
-    return plan
+    return meal_plan_payload(db_plan)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _save_streamed_plan(user_id: int, key: str, data: GeneratePlanRequest, plan: dict) -> int:
+    # A Session da requisição já foi liberada quando o streaming termina
+    async with AsyncSessionLocal() as db:
+        db_plan = await crud_meal_plan.create_meal_plan(
+            db, user_id=user_id, cache_key=key, days=data.days, variety=data.variety, plan=plan
+        )
+        return db_plan.id
+
+async def _plan_events(prompt: str, key: str, cached: dict | None, user_id: int, data: GeneratePlanRequest, plan_id: int | None):
+    # Cache hit: manda tudo de uma vez
+    if cached is not None:
+        for day in cached.get("days", []):
+            yield _sse("day", day)
+        if plan_id is None:
+            plan_id = await _save_streamed_plan(user_id, key, data, cached)
+        yield _sse("done", {"days": len(cached.get("days", [])), "cached": True, "plan_id": plan_id})
+        return
+
+    days = []
+    try:
+        async for day in stream_meal_plan_days(prompt):
+            days.append(day)
+            yield _sse("day", day)
+    except Exception as e:
+        print(f"❌ Erro no streaming: {e}")
+        yield _sse("error", {"detail": "Erro ao gerar plano com a IA."})
+        return
+
+    # Só guarda plano completo: resposta truncada ou com dias faltando não vai pro cache
+    if len(days) != data.days:
+        print(f"❌ Plano incompleto no streaming: {len(days)} de {data.days} dias")
+        yield _sse("error", {"detail": "A IA devolveu um plano incompleto."})
+        return
+
+    async with AsyncSessionLocal() as db:
+        await save_cached_plan(key, {"days": days}, db)
+    plan_id = await _save_streamed_plan(user_id, key, data, {"days": days})
+    yield _sse("done", {"days": len(days), "cached": False, "plan_id": plan_id})
+
+@router.post("/generate-plan/stream")
+async def stream_ai_plan(
+    data: GeneratePlanRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mesmo plano do /generate-plan, mas enviado dia a dia via Server-Sent Events."""
+    profile = current_user.profile
+    if not profile:
+        raise HTTPException(status_code=400, detail="Perfil não encontrado.")
+
+    prompt, key = meal_plan_prompt_and_key(profile, days=data.days, variety_mode=data.variety)
+    cached, plan_id = None, None
+    if not data.fresh:
+        existing = await crud_meal_plan.get_latest_by_key(
+            db, current_user.id, key, max_age_seconds=settings.PLAN_CACHE_TTL_SECONDS
+        )
+        if existing is not None:
+            cached, plan_id = existing.plan, existing.id
+        else:
+            cached = await get_cached_plan(key, db)
+
+    return StreamingResponse(
+        _plan_events(prompt, key, cached, current_user.id, data, plan_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/calculate-calories")
-def calculate_calories(
+async def calculate_calories(
     query: FoodQuery,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    kcal_unit = get_food_calories(db, query.name, query.unit)
+    kcal_unit = await get_food_calories(db, query.name, query.unit)
     total = kcal_unit * query.quantity
     return {"total_calories": round(total, 1)}
 
+@router.post("/calculate-calories/batch")
+async def calculate_calories_batch(
+    queries: List[FoodQuery],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Calcula as calorias de vários alimentos de uma vez (ex: todos os ingredientes de uma receita)."""
+    kcal_units = await get_foods_calories(db, [(query.name, query.unit) for query in queries])
+
+    items = []
+    for query, kcal_unit in zip(queries, kcal_units):
+        items.append({
+            "name": query.name,
+            "quantity": query.quantity,
+            "unit": query.unit,
+            "total_calories": round(kcal_unit * query.quantity, 1),
+        })
+    return {"items": items, "total_calories": round(sum(item["total_calories"] for item in items), 1)}
+
 @router.post("/recipe-by-ingredients")
-def create_recipe_idea(
+async def create_recipe_idea(
     data: IngredientList,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    recipe = generate_recipe_from_ingredients(data.ingredients)
+    # Primeiro tenta as receitas salvas do usuário: sem custo de IA
+    if data.use_saved_recipes:
+        matches = await find_recipes_by_pantry(
+            db, current_user.id, data.ingredients, limit=1,
+            min_coverage=settings.PANTRY_MIN_COVERAGE,
+            min_pantry_coverage=settings.PANTRY_MIN_PANTRY_COVERAGE,
+            min_matched=settings.PANTRY_MIN_MATCHED,
+        )
+        if matches:
+            match = matches[0]
+            recipe = RecipeResponse.model_validate(match["recipe"]).model_dump()
+            return {
+                **recipe, "source": "pantry", "coverage": match["coverage"],
+                "pantry_coverage": match["pantry_coverage"], "missing": match["missing"],
+            }
+
+    recipe = await generate_recipe_from_ingredients(data.ingredients)
     if not recipe:
         raise HTTPException(status_code=500, detail="A IA não conseguiu gerar a receita.")
-    return recipe
+    return {**recipe, "source": "ai"}
 
 @router.post("/plan-to-shopping-list")
-def create_shopping_list_from_plan(
+async def create_shopping_list_from_plan(
     plan_data: Dict[str, Any],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    shopping_data = generate_shopping_list_from_plan(plan_data)
+    db_list = await save_plan_shopping_list(db, current_user.id, plan_data)
     
-    if not shopping_data:
+    if not db_list:
         raise HTTPException(status_code=500, detail="Erro ao gerar lista de compras.")
-    
-    db_list = ShoppingList(title=shopping_data.get("title", "Lista Automática"), user_id=current_user.id)
-    db.add(db_list)
-    db.commit()
-    db.refresh(db_list)
-    
-    for item_name in shopping_data.get("items", []):
-        db_item = ShoppingItem(name=item_name, list_id=db_list.id)
-        db.add(db_item)
-    
-    db.commit()
-    return {"message": "Lista criada!", "list_id": db_list.id}
\ No newline at end of file
+    return {"message": "Lista criada!", "list_id": db_list.id}
+
+# --- JOBS (geração em segundo plano) ---
+
+@router.post("/jobs", response_model=AIJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_ai_job(
+    data: AIJobCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Enfileira uma geração demorada e responde na hora com o id do job (consultar em GET /ai/jobs/{id})."""
+    try:
+        params = JOB_PARAMS[data.kind].model_validate(data.params).model_dump()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    job = await enqueue_job(db, current_user_id, data.kind, params)
+    if job is None:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Limite de {settings.AI_JOBS_PER_USER} gerações simultâneas atingido. Aguarde uma terminar.",
+            headers={"Retry-After": str(int(settings.AI_JOB_POLL_INTERVAL_SECONDS) or 1)},
+        )
+    return job
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def read_ai_job(
+    job_id: int,
+    wait: int = Query(0, ge=0, le=settings.AI_JOB_MAX_WAIT_SECONDS, description="Segundos esperando o job terminar (long-poll)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    job = await wait_for_job(job_id, current_user_id, wait) if wait else await get_job(db, job_id, current_user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
\ No newline at end of file
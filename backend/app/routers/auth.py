@@ -2,36 +2,58 @@ from datetime import timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.core import security
 from app.crud import user as crud_user
 from app.schemas.token import Token
 from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.auth_cache import invalidate_principal
+from app.models.user import User
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Busca o usuário pelo email
-    user = crud_user.get_user_by_email(db, email=form_data.username)
+    user = await crud_user.get_user_by_email(db, email=form_data.username)
     
     # Usuário existe e se senha bate
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await security.verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Parâmetros do Argon2 mudaram: aproveita a senha em texto para refazer o hash
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     
     # Gera o tempo de expiração
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "email": user.email, "ver": user.token_version},
+        expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout-all")
+async def logout_all_sessions(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Invalida todos os tokens já emitidos para o usuário logado."""
+    await crud_user.revoke_tokens(db, user_id=current_user.id)
+    invalidate_principal(current_user.id)
+    return {"message": "Sessões encerradas"}
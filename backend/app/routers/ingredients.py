@@ -1,46 +1,67 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.schemas.ingredient import IngredientCreate, IngredientResponse
 from app.crud import ingredient as crud_ingredient
 from app.crud import recipe as crud_recipe
-from app.core.deps import get_current_user
-from app.models.user import User
+from app.core.deps import get_current_user_id
+from app.services.pantry import invalidate_pantry
 
 router = APIRouter()
 
 @router.post("/", response_model=IngredientResponse)
-def add_ingredient(
+async def add_ingredient(
     ingredient: IngredientCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Adiciona um ingrediente a uma receita existente."""
     # 1. Verifica se a receita existe
-    recipe = crud_recipe.get_recipe(db, recipe_id=ingredient.recipe_id)
+    recipe = await crud_recipe.get_recipe(db, recipe_id=ingredient.recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
     # 2. Segurança: Verifica se a receita pertence ao usuário logado
-    if recipe.user_id != current_user.id:
+    if recipe.user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to edit this recipe")
 
-    return crud_ingredient.create_ingredient(db=db, ingredient=ingredient)
+    db_ingredient = await crud_ingredient.create_ingredient(db=db, ingredient=ingredient)
+    invalidate_pantry(current_user_id)
+    return db_ingredient
 
 @router.get("/recipe/{recipe_id}", response_model=List[IngredientResponse])
-def list_ingredients_by_recipe(
+async def list_ingredients_by_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Lista ingredientes de uma receita específica."""
-    recipe = crud_recipe.get_recipe(db, recipe_id=recipe_id)
+    recipe = await crud_recipe.get_recipe(db, recipe_id=recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
         
-    if recipe.user_id != current_user.id:
+    if recipe.user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    return crud_ingredient.get_ingredients_by_recipe(db, recipe_id=recipe_id)
\ No newline at end of file
+    return await crud_ingredient.get_ingredients_by_recipe(db, recipe_id=recipe_id)
+
+@router.delete("/{ingredient_id}")
+async def remove_ingredient(
+    ingredient_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Remove um ingrediente (as calorias da receita são descontadas)."""
+    db_ingredient = await crud_ingredient.get_ingredient(db, ingredient_id=ingredient_id)
+    if not db_ingredient:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+
+    recipe = await crud_recipe.get_recipe(db, recipe_id=db_ingredient.recipe_id)
+    if recipe.user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to edit this recipe")
+
+    await crud_ingredient.delete_ingredient(db=db, ingredient_id=ingredient_id)
+    invalidate_pantry(current_user_id)
+    return {"message": "Ingrediente removido com sucesso"}
\ No newline at end of file
@@ -0,0 +1,61 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.core.deps import get_current_user_id
+from app.crud import meal_plan as crud_meal_plan
+from app.schemas.meal_plan import MealPlanResponse, MealPlanSummary
+from app.services.meal_plans import create_shopping_list_from_plan
+
+router = APIRouter()
+
+@router.get("/", response_model=List[MealPlanSummary])
+async def read_meal_plans(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Planos gerados pelo usuário, mais recentes primeiro (sem o conteúdo)."""
+    plans = await crud_meal_plan.get_meal_plans(db, current_user_id, limit=limit, before_id=cursor)
+    if len(plans) == limit:
+        response.headers["X-Next-Cursor"] = str(plans[-1].id)
+    return plans
+
+@router.get("/{plan_id}", response_model=MealPlanResponse)
+async def read_meal_plan(
+    plan_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    db_plan = await crud_meal_plan.get_meal_plan(db, plan_id, current_user_id)
+    if db_plan is None:
+        raise HTTPException(status_code=404, detail="Plano não encontrado")
+    return db_plan
+
+@router.delete("/{plan_id}")
+async def delete_meal_plan(
+    plan_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    if not await crud_meal_plan.delete_meal_plan(db, plan_id, current_user_id):
+        raise HTTPException(status_code=404, detail="Plano não encontrado")
+    return {"message": "Plano deletado"}
+
+@router.post("/{plan_id}/shopping-list")
+async def create_shopping_list(
+    plan_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Cria a lista de compras de um plano salvo, sem reenviar o JSON."""
+    db_plan = await crud_meal_plan.get_meal_plan(db, plan_id, current_user_id)
+    if db_plan is None:
+        raise HTTPException(status_code=404, detail="Plano não encontrado")
+
+    db_list = await create_shopping_list_from_plan(db, current_user_id, db_plan.plan)
+    if db_list is None:
+        raise HTTPException(status_code=500, detail="Erro ao gerar lista de compras.")
+    return {"message": "Lista criada!", "list_id": db_list.id}
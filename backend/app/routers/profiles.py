@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.schemas.profile import ProfileCreate, ProfileResponse
 from app.crud import profile as crud_profile
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_current_user_id
 from app.models.user import User
+from app.models.profile import Profile
 from app.models.weight_history import WeightHistory
-from app.schemas.weight import WeightHistoryCreate, WeightHistoryResponse
+from app.core.auth_cache import invalidate_principal
+from app.schemas.weight import WeightHistoryCreate, WeightHistoryResponse, WeightSeriesResponse
+from app.services.series import build_weight_series
 
 router = APIRouter()
 
 @router.get("/me", response_model=ProfileResponse)
-def read_my_profile(
+async def read_my_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retorna o perfil do usuário logado."""
     if not current_user.profile:
@@ -21,22 +27,22 @@ def read_my_profile(
     return current_user.profile
 
 @router.put("/me", response_model=ProfileResponse)
-def upsert_my_profile(
+async def upsert_my_profile(
     profile_data: ProfileCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cria ou Atualiza o perfil do usuário logado."""
-    return crud_profile.create_or_update_profile(
+    return await crud_profile.create_or_update_profile(
         db=db,
         profile=profile_data,
         user_id=current_user.id
     )
 
 @router.post("/weight", response_model=WeightHistoryResponse)
-def track_weight(
+async def track_weight(
     weight_data: WeightHistoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Registra um novo peso no histórico e atualiza o perfil atual."""
@@ -47,19 +53,56 @@ def track_weight(
     )
     db.add(history)
     
-    # 2. Atualiza o perfil atual (se existir)
+    # 2. Atualiza o perfil atual (se existir). O current_user vem do cache e é só leitura,
+    # então a alteração vai direto no banco
     if current_user.profile:
-        current_user.profile.weight = weight_data.weight
-        db.add(current_user.profile)
+        await db.execute(
+            update(Profile).where(Profile.user_id == current_user.id).values(weight=weight_data.weight)
+        )
     
-    db.commit()
-    db.refresh(history)
+    await db.commit()
+    await db.refresh(history)
+    invalidate_principal(current_user.id)
     return history
 
 @router.get("/weight/history", response_model=list[WeightHistoryResponse])
-def get_weight_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_weight_history(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Pega todo o histórico para gerar o gráfico."""
-    return db.query(WeightHistory).filter(WeightHistory.user_id == current_user.id).order_by(WeightHistory.date.asc()).all()
\ No newline at end of file
+    result = await db.execute(
+        select(WeightHistory).where(WeightHistory.user_id == current_user_id).order_by(WeightHistory.date.asc())
+    )
+    return result.scalars().all()
+
+@router.get("/weight/series", response_model=WeightSeriesResponse)
+async def get_weight_series(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Literal["raw", "day", "week", "month"] = "raw",
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Reduz a série para no máximo N pontos (LTTB)"),
+    window: int = Query(7, ge=1, le=365, description="Tamanho da média móvel, em pontos"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Série de peso para o gráfico: filtro de datas, médias por dia/semana/mês, média móvel e tendência."""
+    if bucket == "raw":
+        period = WeightHistory.date
+        weight = WeightHistory.weight
+    else:
+        # Literal (bucket já é validado): com parâmetro, o Postgres não reconhece o mesmo date_trunc no GROUP BY
+        period = func.date_trunc(literal_column(f"'{bucket}'"), WeightHistory.date)
+        weight = func.avg(WeightHistory.weight)
+
+    query = select(period.label("period"), weight.label("weight")).where(WeightHistory.user_id == current_user_id)
+    if start is not None:
+        query = query.where(WeightHistory.date >= start)
+    if end is not None:
+        query = query.where(WeightHistory.date < end)
+    if bucket != "raw":
+        query = query.group_by(period)
+
+    rows = (await db.execute(query.order_by(period))).all()
+    series = build_weight_series([row.period for row in rows], [row.weight for row in rows], window=window, points=points)
+    return {"bucket": bucket, **series}
\ No newline at end of file
@@ -1,64 +1,157 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.recipe import RecipeCreate, RecipeResponse
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.schemas.recipe import PantryMatch, RecipeCreate, RecipeNutrition, RecipeResponse
 from app.crud import recipe as crud_recipe
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_current_user_id
 from app.models.user import User
+from app.services.pantry import find_recipes_by_pantry
+from app.services.nutrients import NUTRIENTS, food_table
+from app.services.ai import get_foods_calories
 
 router = APIRouter()
 
+# Limite por requisição do import em lote
+MAX_BULK_RECIPES = 500
+
 @router.post("/", response_model=RecipeResponse)
-def create_recipe(
+async def create_recipe(
     recipe: RecipeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Cria uma nova receita."""
-    return crud_recipe.create_recipe(db=db, recipe=recipe, user_id=current_user.id)
+    return await crud_recipe.create_recipe(db=db, recipe=recipe, user_id=current_user_id)
+
+@router.post("/bulk", response_model=List[RecipeResponse])
+async def create_recipes_bulk(
+    recipes: List[RecipeCreate] = Body(..., min_length=1, max_length=MAX_BULK_RECIPES),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Importa várias receitas (ex: geradas pela IA ou vindas de outro sistema) em uma única transação."""
+    return await crud_recipe.create_recipes(db=db, recipes=recipes, user_id=current_user_id)
 
 @router.get("/", response_model=List[RecipeResponse])
-def read_recipes(
+async def read_recipes(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    category: Optional[str] = None,
+    preparation_method: Optional[str] = None,
+    is_favorite: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
-    """Lista todas as receitas do usuário logado."""
-    return crud_recipe.get_recipes(db=db, user_id=current_user.id, skip=skip, limit=limit)
+    """Lista as receitas do usuário logado. Se a página veio cheia, o cursor da próxima vai no header X-Next-Cursor."""
+    recipes = await crud_recipe.get_recipes(
+        db=db,
+        user_id=current_user_id,
+        skip=skip,
+        limit=limit,
+        after_id=cursor,
+        category=category,
+        preparation_method=preparation_method,
+        is_favorite=is_favorite,
+    )
+    if len(recipes) == limit:
+        response.headers["X-Next-Cursor"] = str(recipes[-1].id)
+    return recipes
+
+@router.get("/search", response_model=List[RecipeResponse])
+async def search_recipes(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Busca receitas do usuário por título, ingredientes e descrição, das mais relevantes para as menos."""
+    return await crud_recipe.search_recipes(db=db, user_id=current_user_id, q=q, limit=limit)
+
+@router.get("/pantry", response_model=List[PantryMatch])
+async def recipes_from_pantry(
+    ingredients: List[str] = Query(..., min_length=1, description="O que o usuário tem em casa"),
+    min_coverage: float = Query(0.5, ge=0, le=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Receitas salvas que dá para fazer com os ingredientes informados, das mais completas para as menos."""
+    return await find_recipes_by_pantry(
+        db, current_user_id, ingredients, min_coverage=min_coverage, limit=limit
+    )
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def read_recipe(
+async def read_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Busca uma receita específica pelo ID."""
-    db_recipe = crud_recipe.get_recipe(db, recipe_id=recipe_id)
+    db_recipe = await crud_recipe.get_recipe(db, recipe_id=recipe_id)
     if db_recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
     # Segurança: garante que a receita pertence ao usuário logado
-    if db_recipe.user_id != current_user.id:
+    if db_recipe.user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this recipe")
     return db_recipe
 
+@router.get("/{recipe_id}/nutrition", response_model=RecipeNutrition)
+async def read_recipe_nutrition(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Calorias e macros da receita pela tabela local. A IA só entra para ingredientes desconhecidos sem kcal salva."""
+    db_recipe = await crud_recipe.get_recipe(db, recipe_id=recipe_id)
+    if db_recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    if db_recipe.user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this recipe")
+
+    ingredients = db_recipe.ingredients
+    values, known = food_table().compute([(ing.name, ing.quantity, ing.unit) for ing in ingredients])
+    sources = ["table" if is_known else "ingredient" for is_known in known]
+
+    ask_ai = [i for i, ing in enumerate(ingredients) if not known[i] and not ing.calories]
+    if ask_ai:
+        per_unit = await get_foods_calories(db, [(ingredients[i].name, ingredients[i].unit) for i in ask_ai])
+        for i, calories in zip(ask_ai, per_unit):
+            values[i, 0] = calories * ingredients[i].quantity
+            sources[i] = "ai"
+    for i, ing in enumerate(ingredients):
+        if sources[i] == "ingredient":
+            values[i, 0] = ing.calories
+
+    values = values.round(1)
+    return {
+        "recipe_id": db_recipe.id,
+        "totals": dict(zip(NUTRIENTS, values.sum(axis=0).round(1).tolist())),
+        "ingredients": [
+            {"name": ing.name, "quantity": ing.quantity, "unit": ing.unit, "source": source, **dict(zip(NUTRIENTS, row))}
+            for ing, source, row in zip(ingredients, sources, values.tolist())
+        ],
+        "unknown": [ing.name for ing, is_known in zip(ingredients, known) if not is_known],
+    }
+
 @router.put("/{recipe_id}", response_model=RecipeResponse)
-def update_recipe(
+async def update_recipe(
     recipe_id: int,
     recipe_in: RecipeCreate, # Usa o mesmo schema de criação
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Atualiza uma receita existente."""
     # 1. Busca a receita
-    db_recipe = crud_recipe.get_recipe(db, recipe_id=recipe_id)
+    db_recipe = await crud_recipe.get_recipe(db, recipe_id=recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Receita não encontrada")
     
     # 2. Verifica se é o dono
-    if db_recipe.user_id != current_user.id:
+    if db_recipe.user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Você não tem permissão para editar esta receita")
 
     # 3. Atualiza
@@ -67,17 +160,17 @@ def update_recipe(
     if 'ingredients' in update_data:
         del update_data['ingredients']
 
-    return crud_recipe.update_recipe(db=db, db_recipe=db_recipe, recipe_data=update_data)
+    return await crud_recipe.update_recipe(db=db, db_recipe=db_recipe, recipe_data=update_data)
 
 @router.delete("/{recipe_id}")
-def delete_recipe(
+async def delete_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deleta uma receita."""
     # 1. Busca a receita
-    db_recipe = crud_recipe.get_recipe(db, recipe_id=recipe_id)
+    db_recipe = await crud_recipe.get_recipe(db, recipe_id=recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Receita não encontrada")
     
@@ -86,5 +179,5 @@ def delete_recipe(
         raise HTTPException(status_code=403, detail="Você não tem permissão para excluir esta receita")
 
     # 3. Deleta
-    crud_recipe.delete_recipe(db=db, recipe_id=recipe_id)
+    await crud_recipe.delete_recipe(db=db, recipe_id=recipe_id)
     return {"message": "Receita deletada com sucesso"}
\ No newline at end of file
@@ -1,99 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.deps import get_current_user
-from app.models.user import User
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.core.deps import get_current_user_id
 from app.models.shopping import ShoppingList, ShoppingItem
 from app.schemas.shopping import ShoppingListCreate, ShoppingListResponse, ShoppingItemCreate, ShoppingItemResponse
+from app.schemas.shopping import ShoppingItemsBatch, ShoppingItemsBatchResult, ShoppingListSummary
+from app.crud import shopping as crud_shopping
 
 router = APIRouter()
 
+async def _get_user_item(db: AsyncSession, item_id: int, user_id: int):
+    # Join para garantir que o item pertence a uma lista do usuário
+    result = await db.execute(
+        select(ShoppingItem).join(ShoppingList).where(
+            ShoppingItem.id == item_id,
+            ShoppingList.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+def _parse_cursor(cursor: Optional[str]):
+    if cursor is None:
+        return None
+    try:
+        return crud_shopping.decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def _set_next_cursor(response: Response, page: list, limit: int):
+    # Página cheia: pode haver mais. O cliente manda o header de volta em ?cursor=
+    if len(page) == limit:
+        response.headers["X-Next-Cursor"] = crud_shopping.encode_cursor(page[-1])
+
 # --- LISTAS ---
 
 @router.get("/", response_model=list[ShoppingListResponse])
-def get_lists(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(ShoppingList).filter(ShoppingList.user_id == current_user.id).order_by(ShoppingList.created_at.desc()).all()
+async def get_lists(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Listas mais recentes primeiro, com os itens."""
+    lists = await crud_shopping.get_lists(db, current_user_id, limit=limit, before=_parse_cursor(cursor))
+    _set_next_cursor(response, lists, limit)
+    return lists
+
+@router.get("/summary", response_model=list[ShoppingListSummary])
+async def get_list_summaries(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Listas mais recentes primeiro, só com a contagem de itens (tela inicial)."""
+    summaries = await crud_shopping.get_list_summaries(db, current_user_id, limit=limit, before=_parse_cursor(cursor))
+    _set_next_cursor(response, summaries, limit)
+    return summaries
 
 @router.post("/", response_model=ShoppingListResponse)
-def create_list(
+async def create_list(
     list_data: ShoppingListCreate, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db), 
+    current_user_id: int = Depends(get_current_user_id)
 ):
-    # Cria a lista
-    db_list = ShoppingList(title=list_data.title, user_id=current_user.id)
-    db.add(db_list)
-    db.commit()
-    db.refresh(db_list)
-    
-    # Adiciona itens iniciais se houver
-    for item in list_data.items:
-        db_item = ShoppingItem(name=item.name, checked=item.checked, list_id=db_list.id)
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_list)
-    return db_list
+    # Cria a lista já com os itens iniciais (se houver) em um único commit
+    return await crud_shopping.create_list(
+        db, user_id=current_user_id, title=list_data.title, items=[item.model_dump() for item in list_data.items]
+    )
 
 @router.delete("/{list_id}")
-def delete_list(list_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_list = db.query(ShoppingList).filter(ShoppingList.id == list_id, ShoppingList.user_id == current_user.id).first()
+async def delete_list(list_id: int, db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(get_current_user_id)):
+    result = await db.execute(
+        select(ShoppingList).where(ShoppingList.id == list_id, ShoppingList.user_id == current_user_id)
+    )
+    db_list = result.scalars().first()
     if not db_list:
         raise HTTPException(status_code=404, detail="Lista não encontrada")
-    db.delete(db_list)
-    db.commit()
+    await db.delete(db_list)
+    await db.commit()
     return {"message": "Lista deletada"}
 
 # --- ITENS (Adicionar/Remover/Marcar) ---
 
 @router.post("/{list_id}/items", response_model=ShoppingItemResponse)
-def add_item(
+async def add_item(
     list_id: int, 
     item_data: ShoppingItemCreate, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db), 
+    current_user_id: int = Depends(get_current_user_id)
 ):
     # Verifica se a lista pertence ao usuário
-    db_list = db.query(ShoppingList).filter(ShoppingList.id == list_id, ShoppingList.user_id == current_user.id).first()
-    if not db_list:
+    if not await crud_shopping.user_owns_list(db, list_id, current_user_id):
         raise HTTPException(status_code=404, detail="Lista não encontrada")
         
     db_item = ShoppingItem(**item_data.model_dump(), list_id=list_id)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
 
+@router.patch("/{list_id}/items", response_model=ShoppingItemsBatchResult)
+async def update_items(
+    list_id: int,
+    changes: ShoppingItemsBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Marca, desmarca e remove vários itens da lista em uma única requisição."""
+    if not await crud_shopping.user_owns_list(db, list_id, current_user_id):
+        raise HTTPException(status_code=404, detail="Lista não encontrada")
+
+    return await crud_shopping.apply_item_changes(
+        db, list_id, check=set(changes.check), uncheck=set(changes.uncheck), remove=set(changes.delete)
+    )
+
 @router.patch("/items/{item_id}/toggle", response_model=ShoppingItemResponse)
-def toggle_item_check(
+async def toggle_item_check(
     item_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db), 
+    current_user_id: int = Depends(get_current_user_id)
 ):
-    # Join para garantir que o item pertence a uma lista do usuário
-    db_item = db.query(ShoppingItem).join(ShoppingList).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingList.user_id == current_user.id
-    ).first()
+    db_item = await _get_user_item(db, item_id, current_user_id)
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
         
     db_item.checked = not db_item.checked
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
     return db_item
 
 @router.delete("/items/{item_id}")
-def delete_item(item_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_item = db.query(ShoppingItem).join(ShoppingList).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingList.user_id == current_user.id
-    ).first()
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(get_current_user_id)):
+    db_item = await _get_user_item(db, item_id, current_user_id)
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
         
-    db.delete(db_item)
-    db.commit()
-    return {"message": "Item deletado"}
\ No newline at end of file
+    await db.delete(db_item)
+    await db.commit()
+    return {"message": "Item deletado"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.schemas.user import UserCreate, UserResponse
 from app.crud import user as crud_user
 from app.core.deps import get_current_user
@@ -9,14 +9,14 @@ from app.models.user import User
 router = APIRouter()
 
 @router.post("/", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await crud_user.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    return crud_user.create_user(db=db, user=user)
+    return await crud_user.create_user(db=db, user=user)
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(current_user: User = Depends(get_current_user)):
+async def read_user_me(current_user: User = Depends(get_current_user)):
     """Retorna os dados do usuário logado (incluindo is_superuser)."""
     return current_user
\ No newline at end of file
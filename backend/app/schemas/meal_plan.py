@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict
+from datetime import datetime
+
+class MealPlanSummary(BaseModel):
+    id: int
+    days: int
+    variety: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+class MealPlanResponse(MealPlanSummary):
+    plan: Dict[str, Any]
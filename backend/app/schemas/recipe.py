@@ -23,4 +23,29 @@ class RecipeResponse(RecipeBase):
 
     ingredients: List[IngredientResponse] = []
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class NutritionFacts(BaseModel):
+    calories: float = 0.0
+    protein_g: float = 0.0
+    carbs_g: float = 0.0
+    fat_g: float = 0.0
+    fiber_g: float = 0.0
+
+class IngredientNutrition(NutritionFacts):
+    name: str
+    quantity: float
+    unit: str
+    source: str # "table" (tabela local), "ingredient" (kcal salva no ingrediente) ou "ai"
+
+class RecipeNutrition(BaseModel):
+    recipe_id: int
+    totals: NutritionFacts
+    ingredients: List[IngredientNutrition] = []
+    unknown: List[str] = [] # Ingredientes fora da tabela local: só as calorias são conhecidas
+
+class PantryMatch(BaseModel):
+    recipe: RecipeResponse
+    coverage: float # Fração dos ingredientes (fora sal, óleo, água...) que a despensa cobre
+    pantry_coverage: float # Fração dos itens da despensa que a receita usa
+    missing: List[str] = []
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -15,6 +15,16 @@ class ShoppingItemResponse(ShoppingItemBase):
     list_id: int
     model_config = ConfigDict(from_attributes=True)
 
+# Alterações em lote (ex: marcar vários itens de uma vez no mercado)
+class ShoppingItemsBatch(BaseModel):
+    check: List[int] = Field(default=[], max_length=1000)
+    uncheck: List[int] = Field(default=[], max_length=1000)
+    delete: List[int] = Field(default=[], max_length=1000)
+
+class ShoppingItemsBatchResult(BaseModel):
+    updated: int
+    deleted: int
+
 # --- LIST ---
 class ShoppingListBase(BaseModel):
     title: str = "Minha Lista"
@@ -23,6 +33,13 @@ class ShoppingListCreate(ShoppingListBase):
     # Opcional: Já criar lista com itens
     items: List[ShoppingItemCreate] = []
 
+class ShoppingListSummary(ShoppingListBase):
+    id: int
+    created_at: datetime
+    item_count: int
+    checked_count: int
+    model_config = ConfigDict(from_attributes=True)
+
 class ShoppingListResponse(ShoppingListBase):
     id: int
     created_at: datetime
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from typing import List, Optional
 
 class WeightHistoryBase(BaseModel):
     weight: float
@@ -10,4 +11,19 @@ class WeightHistoryCreate(WeightHistoryBase):
 class WeightHistoryResponse(WeightHistoryBase):
     id: int
     date: datetime
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- SÉRIE PARA O GRÁFICO ---
+class WeightPoint(BaseModel):
+    date: datetime
+    weight: float
+    moving_average: float
+
+class WeightTrend(BaseModel):
+    kg_per_week: float # Inclinação da reta ajustada aos pontos
+    change_kg: float # Último ponto menos o primeiro
+
+class WeightSeriesResponse(BaseModel):
+    bucket: str
+    points: List[WeightPoint] = []
+    trend: Optional[WeightTrend] = None
\ No newline at end of file
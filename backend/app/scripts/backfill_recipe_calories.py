@@ -0,0 +1,42 @@
+"""
+Recalcula Recipe.calories a partir da soma das calorias dos ingredientes.
+
+Rodar uma vez (depois disso o total é mantido pelo crud de ingredientes):
+    python -m app.scripts.backfill_recipe_calories
+"""
+import asyncio
+from sqlalchemy import func, select, update
+from app.db.session import AsyncSessionLocal, engine
+from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
+import app.models.user, app.models.profile, app.models.shopping, app.models.weight_history # noqa: F401 (registra os mappers)
+
+async def backfill_recipe_calories() -> int:
+    # Um único UPDATE ... FROM (SELECT ... GROUP BY): o banco faz a soma de tudo de uma vez.
+    # Receitas sem calorias nos ingredientes mantêm o valor informado pelo usuário.
+    totals = (
+        select(Ingredient.recipe_id, func.sum(Ingredient.calories).label("total"))
+        .group_by(Ingredient.recipe_id)
+        .having(func.sum(Ingredient.calories) > 0)
+        .subquery()
+    )
+    stmt = (
+        update(Recipe)
+        .where(Recipe.id == totals.c.recipe_id)
+        .values(calories=totals.c.total)
+        .execution_options(synchronize_session=False)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(stmt)
+        await db.commit()
+    return result.rowcount
+
+async def main():
+    try:
+        updated = await backfill_recipe_calories()
+        print(f"Receitas atualizadas: {updated}")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,41 +1,87 @@
-import httpx
+import asyncio
 import json
-from sqlalchemy.orm import Session
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.schemas.profile import ProfileResponse
-from app.models.food_cache import FoodCache
+from app.services.llm import llm_client
+from app.services.plan_cache import normalize_plan_profile, plan_cache_key, get_cached_plan, save_cached_plan
+from app.services.json_stream import JsonArrayStreamParser
+from app.services.food_cache import food_cache_key, lookup_calories, store_calories
+from app.services.nutrients import local_calories
+from app.services.shopping import consolidate_plan
+from app.services.cache import HitCounter
 
-GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={settings.GEMINI_API_KEY}"
+# Single-flight: prompt -> chamada em andamento. Prompts idênticos simultâneos esperam a mesma
+_inflight: dict[str, asyncio.Task] = {}
+single_flight_counter = HitCounter("llm_single_flight")
 
-def call_gemini(prompt: str):
-    """Função centralizada para chamar o Google."""
-    payload = { "contents": [{ "parts": [{"text": prompt}] }] }
+async def _call_gemini(prompt: str):
     try:
         print(f"📡 Chamando IA...")
-        with httpx.Client() as client:
-            # Aumentei o timeout para 120s porque gerar 7 dias demora mais
-            response = client.post(GEMINI_URL, json=payload, timeout=120.0)
-            
-            if response.status_code != 200:
-                print(f"❌ Erro Google ({response.status_code}): {response.text}")
-                return None
-
-            data = response.json()
-            if 'candidates' in data and data['candidates']:
-                raw_text = data['candidates'][0]['content']['parts'][0]['text']
-                clean_text = raw_text.replace('```json', '').replace('```', '').strip()
-                return clean_text
-            else:
-                return None
+        raw_text = await llm_client.generate(prompt)
+        if not raw_text:
+            return None
+        clean_text = raw_text.replace('```json', '').replace('```', '').strip()
+        return clean_text
     except Exception as e:
         print(f"❌ Erro Python: {e}")
         return None
 
-def generate_meal_plan(profile: ProfileResponse, days: int = 1, variety_mode: str = "varied"):
+async def call_gemini(prompt: str):
     """
-    Gera o plano alimentar com controle de variedade.
-    variety_mode: 'varied' (muita variedade) ou 'repetitive' (meal prep/prático).
+    Função centralizada para chamar o Google.
+    Se o mesmo prompt já está em andamento, reaproveita a chamada em vez de abrir outra.
     """
+    task = _inflight.get(prompt)
+    if task is None:
+        single_flight_counter.miss()
+        task = asyncio.create_task(_call_gemini(prompt))
+        _inflight[prompt] = task
+        task.add_done_callback(lambda _: _inflight.pop(prompt, None))
+    else:
+        single_flight_counter.hit()
+    # shield: se quem chegou primeiro desconectar, a chamada continua para os outros
+    return await asyncio.shield(task)
+
+# Temas usados no fan-out para que dias gerados em paralelo não fiquem iguais
+DAY_THEMES = [
+    "cozinha brasileira caseira",
+    "inspiração mediterrânea",
+    "grelhados e saladas",
+    "pratos de forno",
+    "inspiração asiática leve",
+    "grãos e leguminosas",
+    "comida afetiva mais saudável",
+]
+
+DAY_JSON_STRUCTURE = """
+    {{
+      "day": "Dia {number}",
+      "calories_target": 2000,
+      "macros": {{ "protein": "...", "carbs": "...", "fats": "..." }},
+      "meals": [
+        {{ "name": "Café da Manhã", "suggestion": "..." }},
+        {{ "name": "Almoço", "suggestion": "..." }},
+        {{ "name": "Lanche", "suggestion": "..." }},
+        {{ "name": "Jantar", "suggestion": "..." }}
+      ],
+      "tip": "Dica específica."
+    }}
+"""
+
+def _profile_block(profile: dict) -> str:
+    return f"""DADOS:
+    - Perfil: {profile["age"]} anos, {profile["weight"]} kg, {profile["height"]} cm.
+    - Meta Diária: {profile["daily_calories"]:.0f} kcal.
+    - Objetivo: {profile["goal"]}.
+    - Dieta: {profile["diet_type"]}.
+    - Alergias (CRÍTICO): {profile["allergies"] or "Nenhuma"}.
+    - Gosta: {profile["food_likes"]}.
+    - Odeia: {profile["food_dislikes"]}."""
+
+def build_meal_plan_prompt(profile: dict, days: int = 1, variety_mode: str = "varied") -> str:
+    """Monta o prompt a partir do perfil já normalizado (ver normalize_plan_profile)."""
     
     # Lógica de Variedade
     variety_instruction = ""
@@ -60,14 +106,7 @@ def generate_meal_plan(profile: ProfileResponse, days: int = 1, variety_mode: st
     prompt = f"""
     Atue como um nutricionista esportivo. Crie um plano alimentar para {days} dias.
     
-    DADOS:
-    - Perfil: {profile.age} anos, {profile.weight} kg, {profile.height} cm.
-    - Meta Diária: {profile.daily_calories:.0f} kcal.
-    - Objetivo: {profile.goal}.
-    - Dieta: {profile.diet_type}.
-    - Alergias (CRÍTICO): {profile.allergies or "Nenhuma"}.
-    - Gosta: {profile.food_likes}.
-    - Odeia: {profile.food_dislikes}.
+    {_profile_block(profile)}
     
     {variety_instruction}
     
@@ -89,29 +128,236 @@ def generate_meal_plan(profile: ProfileResponse, days: int = 1, variety_mode: st
       ]
     }}
     """
+    return prompt
+
+def _theme_instruction(theme: str) -> str:
+    return f"""TEMA DESTE DIA: {theme}.
+    - Os outros dias estão sendo criados com temas diferentes, então siga o tema para não repetir pratos.
+    - Respeite a dieta e as alergias acima de qualquer tema."""
+
+MEAL_PREP_TEMPLATE_INSTRUCTION = """ESTRATÉGIA DE PRATICIDADE (MEAL PREP):
+    - Este dia será o MODELO repetido durante a semana.
+    - Café da Manhã e Lanche serão os mesmos todos os dias.
+    - Foco em ingredientes que podem ser feitos em grande quantidade."""
+
+def build_day_prompt(profile: dict, number: int, days: int, instruction: str) -> str:
+    """Prompt de um único dia, usado no modo fan-out."""
+    return f"""
+    Atue como um nutricionista esportivo. Crie o cardápio do Dia {number} de um plano de {days} dias.
     
-    res = call_gemini(prompt)
-    return json.loads(res) if res else None
+    {_profile_block(profile)}
+    
+    {instruction}
+    
+    Responda APENAS JSON estrito com UM objeto de dia nesta estrutura:
+    {DAY_JSON_STRUCTURE.format(number=number)}
+    """
+
+def build_meal_prep_variant_prompt(profile: dict, template: dict) -> str:
+    """Prompt da segunda opção de Almoço/Jantar do modo meal prep, baseada no dia modelo."""
+    template_text = json.dumps(template, ensure_ascii=False)
+    return f"""
+    Atue como um nutricionista esportivo. O usuário faz MEAL PREP e já tem este dia modelo:
+    
+    {template_text}
+    
+    {_profile_block(profile)}
+    
+    TAREFA:
+    - Mantenha EXATAMENTE o mesmo Café da Manhã e Lanche do dia modelo.
+    - Crie uma segunda opção de Almoço e Jantar para alternar durante a semana.
+    - Use ingredientes que podem ser feitos em grande quantidade.
+    
+    Responda APENAS JSON estrito com UM objeto de dia nesta estrutura:
+    {DAY_JSON_STRUCTURE.format(number=2)}
+    """
+
+def meal_plan_prompt_and_key(profile: ProfileResponse, days: int = 1, variety_mode: str = "varied") -> tuple[str, str]:
+    prompt = build_meal_plan_prompt(normalize_plan_profile(profile), days, variety_mode)
+    return prompt, plan_cache_key(prompt)
+
+async def generate_meal_plan(
+    profile: ProfileResponse,
+    days: int = 1,
+    variety_mode: str = "varied",
+    db: AsyncSession | None = None,
+    fresh: bool = False,
+    fan_out: bool | None = None,
+):
+    """
+    Gera o plano alimentar com controle de variedade.
+    variety_mode: 'varied' (muita variedade) ou 'repetitive' (meal prep/prático).
+    Perfis equivalentes (mesmo prompt normalizado) reaproveitam o plano do cache;
+    fresh=True ignora o cache na leitura, mas grava o novo resultado.
+    fan_out=True gera os dias em paralelo (padrão: PLAN_FANOUT_ENABLED).
+    """
+    prompt, key = meal_plan_prompt_and_key(profile, days, variety_mode)
+
+    if not fresh:
+        cached = await get_cached_plan(key, db)
+        if cached is not None:
+            return cached
+
+    use_fan_out = settings.PLAN_FANOUT_ENABLED if fan_out is None else fan_out
+    if use_fan_out and days > 1:
+        plan = await _generate_meal_plan_fan_out(normalize_plan_profile(profile), days, variety_mode)
+    else:
+        res = await call_gemini(prompt)
+        plan = json.loads(res) if res else None
 
-def get_food_calories(db: Session, food_name: str, unit: str) -> float:
-    clean_name = food_name.lower().strip()
-    cached = db.query(FoodCache).filter(FoodCache.name == clean_name).first()
-    if cached: return cached.calories_per_unit
+    if plan:
+        await save_cached_plan(key, plan, db)
+    return plan
 
-    prompt = f"Responda APENAS um número (float). Quantas calorias (kcal) tem em exatamente 1 {unit} de {food_name}? Exemplo: 1.5"
-    res_text = call_gemini(prompt)
+async def _generate_day(prompt: str, label: str, semaphore: asyncio.Semaphore) -> dict | None:
+    """Gera um dia com novas tentativas independentes se o JSON vier quebrado."""
+    for attempt in range(settings.PLAN_DAY_RETRIES + 1):
+        async with semaphore:
+            res = await call_gemini(prompt)
+        try:
+            day = json.loads(res) if res else None
+            # Às vezes a IA embrulha o dia em {"days": [...]}
+            if isinstance(day, dict) and "days" in day:
+                day = day["days"][0]
+            if isinstance(day, dict) and isinstance(day.get("meals"), list):
+                day["day"] = label
+                return day
+        except (ValueError, IndexError, KeyError, TypeError):
+            pass
+        print(f"⚠️ {label}: resposta inválida da IA (tentativa {attempt + 1})")
+    return None
+
+async def _generate_meal_plan_fan_out(profile: dict, days: int, variety_mode: str) -> dict | None:
+    """
+    Gera cada dia em uma chamada separada e junta tudo no formato {"days": [...]}.
+    No modo 'repetitive' gera o dia modelo e uma variação de Almoço/Jantar, que se alternam.
+    """
+    semaphore = asyncio.Semaphore(settings.PLAN_FANOUT_CONCURRENCY)
+
+    if variety_mode == "repetitive":
+        template = await _generate_day(build_day_prompt(profile, 1, days, MEAL_PREP_TEMPLATE_INSTRUCTION), "Dia 1", semaphore)
+        if template is None:
+            return None
+        variant = await _generate_day(build_meal_prep_variant_prompt(profile, template), "Dia 2", semaphore)
+        if variant is None:
+            return None
+        options = [template, variant]
+        result = []
+        for i in range(days):
+            day = dict(options[i % 2])
+            day["day"] = f"Dia {i + 1}"
+            result.append(day)
+        return {"days": result}
+
+    tasks = [
+        _generate_day(
+            build_day_prompt(profile, i + 1, days, _theme_instruction(DAY_THEMES[i % len(DAY_THEMES)])),
+            f"Dia {i + 1}",
+            semaphore,
+        )
+        for i in range(days)
+    ]
+    result = await asyncio.gather(*tasks)
+    if any(day is None for day in result):
+        return None
+    return {"days": list(result)}
+
+async def stream_meal_plan_days(prompt: str) -> AsyncIterator[dict]:
+    """
+    Emite cada objeto de days[i] assim que ele chega completo do streaming da IA.
+    Levanta ValueError se a resposta terminar antes de fechar o array (plano truncado).
+    """
+    parser = JsonArrayStreamParser("days")
+    print(f"📡 Chamando IA (streaming)...")
+    async for chunk in llm_client.stream(prompt):
+        for day in parser.feed(chunk):
+            yield day
+        if parser.done:
+            break
+    if not parser.done:
+        raise ValueError("Resposta da IA terminou antes de fechar o array 'days'.")
+
+# Quantidade de referência usada no prompt para cada unidade base (1 g sozinho é impreciso)
+PROMPT_BASE_AMOUNT = {"g": 100.0, "ml": 100.0}
+
+def _base_amount(unit: str) -> float:
+    return PROMPT_BASE_AMOUNT.get(unit, 1.0)
+
+async def get_food_calories(db: AsyncSession, food_name: str, unit: str) -> float:
+    """Kcal em 1 unidade pedida. O cache guarda a unidade base, então 'kg' reaproveita a linha em 'g'."""
+    key, factor = food_cache_key(food_name, unit)
+    local = local_calories([key])
+    if key in local: return local[key] * factor
+    cached = await lookup_calories(db, [key])
+    if key in cached: return cached[key] * factor
+
+    base_unit = key[1]
+    amount = _base_amount(base_unit)
+    prompt = f"Responda APENAS um número (float). Quantas calorias (kcal) tem em exatamente {amount:g} {base_unit} de {food_name}? Exemplo: 1.5"
+    res_text = await call_gemini(prompt)
     
     try:
-        if res_text:
-            calories = float(res_text)
-            new_cache = FoodCache(name=clean_name, calories_per_unit=calories, unit_type=unit)
-            db.add(new_cache)
-            db.commit()
-            return calories
-    except: pass
-    return 0.0
-
-def generate_recipe_from_ingredients(ingredients: list[str]):
+        calories = float(res_text) / amount if res_text else None
+    except ValueError:
+        print(f"❌ Resposta inválida da IA para {food_name}: {res_text}")
+        return 0.0
+    if calories is None:
+        return 0.0
+
+    await store_calories(db, {key: calories})
+    return calories * factor
+
+async def get_foods_calories(db: AsyncSession, foods: list[tuple[str, str]]) -> list[float]:
+    """
+    Versão em lote do get_food_calories: recebe (nome, unidade) e devolve as kcal por unidade
+    na mesma ordem. Os acertos vêm da tabela local, da memória ou de uma query só e as faltas de um único prompt.
+    """
+    resolved = [food_cache_key(name, unit) for name, unit in foods]
+    keys = [key for key, _ in resolved]
+    found = local_calories(keys)
+    unknown = [key for key in keys if key not in found]
+    if unknown:
+        found.update(await lookup_calories(db, unknown))
+
+    missing = {}
+    for (name, _), key in zip(foods, keys):
+        if key not in found and key not in missing:
+            missing[key] = name
+
+    if missing:
+        # A chave do JSON é o índice: nomes normalizados podem colidir entre unidades diferentes
+        missing_keys = list(missing)
+        food_lines = "\n".join(
+            f'    - "{i}": {_base_amount(key[1]):g} {key[1]} de {missing[key]}'
+            for i, key in enumerate(missing_keys)
+        )
+        prompt = f"""
+    Quantas calorias (kcal) tem em exatamente a quantidade indicada de cada alimento abaixo?
+{food_lines}
+    
+    Responda APENAS um JSON estrito mapeando o número de cada alimento para as kcal (float).
+    Exemplo: {{ "0": 130.0, "1": 70.0 }}
+    """
+        res = await call_gemini(prompt)
+        try:
+            answer = json.loads(res) if res else {}
+        except ValueError:
+            answer = {}
+
+        new_values = {}
+        for i, key in enumerate(missing_keys):
+            try:
+                new_values[key] = float(answer[str(i)]) / _base_amount(key[1])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        if new_values:
+            found.update(new_values)
+            await store_calories(db, new_values)
+
+    return [found[key] * factor if key in found else 0.0 for key, factor in resolved]
+
+async def generate_recipe_from_ingredients(ingredients: list[str]):
     ing_list = ", ".join(ingredients)
     prompt = f"""
     Crie uma receita usando: {ing_list}.
@@ -124,38 +370,46 @@ def generate_recipe_from_ingredients(ingredients: list[str]):
       "ingredients": [ {{ "name": "Ingrediente", "quantity": 100, "unit": "g" }} ]
     }}
     """
-    res = call_gemini(prompt)
+    res = await call_gemini(prompt)
     return json.loads(res) if res else None
 
-def generate_shopping_list_from_plan(plan_data: dict):
+SHOPPING_LIST_TITLE = "Compras do Cardápio NutriAgent"
+
+async def generate_shopping_list_from_plan(plan_data: dict):
     """
     Recebe o JSON do plano alimentar e cria uma lista de compras consolidada.
+    A soma é feita localmente (services/shopping); a IA só recebe os trechos que o parser não entendeu.
     """
-    # Transforma o JSON do plano em texto para a IA ler
-    plan_text = json.dumps(plan_data, indent=2, ensure_ascii=False)
-    
+    items, unparsed = consolidate_plan(plan_data)
+    if not unparsed:
+        return {"title": SHOPPING_LIST_TITLE, "items": items}
+
+    unparsed_text = "\n".join(f"    - {line}" for line in unparsed)
     prompt = f"""
-    Atue como um assistente de compras inteligente. Analise este plano alimentar semanal/diário:
+    Atue como um assistente de compras inteligente. Estes trechos de um plano alimentar
+    não foram convertidos em itens de compra:
     
-    {plan_text}
+{unparsed_text}
     
     TAREFA:
-    1. Extraia TODOS os ingredientes necessários para preparar essas refeições.
-    2. CONSOLIDE as quantidades (ex: se tem ovos no café e no jantar, some tudo).
-    3. Ignore itens básicos de despensa como sal, óleo e água, a menos que sejam específicos.
-    4. Gere uma lista de compras prática.
+    1. Extraia os ingredientes necessários para preparar o que está descrito.
+    2. Ignore itens básicos de despensa como sal, óleo e água, a menos que sejam específicos.
+    3. NÃO repita estes itens, que já estão na lista: {", ".join(items) or "nenhum"}.
     
     Responda APENAS um JSON estrito com esta estrutura:
     {{
-      "title": "Compras do Cardápio NutriAgent",
       "items": [
-        "1 dúzia de Ovos",
         "500g de Peito de Frango",
-        "1kg de Batata Doce",
-        "2 litros de Leite Desnatado"
+        "1kg de Batata Doce"
       ]
     }}
     """
     
-    res = call_gemini(prompt)
-    return json.loads(res) if res else None
\ No newline at end of file
+    res = await call_gemini(prompt)
+    try:
+        extra = json.loads(res).get("items", []) if res else []
+    except (ValueError, AttributeError):
+        extra = []
+    if not items and not extra:
+        return None
+    return {"title": SHOPPING_LIST_TITLE, "items": items + [str(item) for item in extra]}
\ No newline at end of file
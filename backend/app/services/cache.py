@@ -0,0 +1,99 @@
+import time
+from typing import Callable
+from collections import OrderedDict
+from threading import Lock
+
+# Funções que devolvem as métricas de cada cache, expostas em /admin/cache-stats
+_registry: dict[str, Callable[[], dict]] = {}
+
+def register_stats(name: str, provider: Callable[[], dict]):
+    _registry[name] = provider
+
+class HitCounter:
+    """Contador simples de hit/miss para camadas que não são um TTLCache (ex: banco)."""
+
+    def __init__(self, name: str):
+        self.hits = 0
+        self.misses = 0
+        register_stats(name, self.stats)
+
+    def hit(self):
+        self.hits += 1
+
+    def miss(self):
+        self.misses += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+class TTLCache:
+    """
+    Cache LRU em memória com expiração por tempo (TTL).
+    Guarda contadores de hit/miss para acompanhar a eficiência.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        register_stats(name, self.stats)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            # Remove os menos usados quando passa do limite
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+def cache_stats() -> dict:
+    """Métricas de todos os caches registrados."""
+    return {name: provider() for name, provider in _registry.items()}
@@ -0,0 +1,149 @@
+import asyncio
+from collections import Counter
+from sqlalchemy import bindparam, select, update, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.food_cache import FoodCache
+from app.services.cache import TTLCache
+from app.services.units import normalize_food_name, to_base_unit
+
+# Camada quente: (nome normalizado, unidade base) -> kcal por unidade base.
+# A invalidação é local ao processo: store_calories limpa só a cópia desta instância,
+# as outras enxergam a mudança quando a entrada expira (FOOD_CACHE_HOT_TTL_SECONDS).
+food_hot_cache = TTLCache("food_calories", settings.FOOD_CACHE_HOT_MAX_ENTRIES, settings.FOOD_CACHE_HOT_TTL_SECONDS)
+
+# Acertos ainda não gravados em food_cache.hit_count (o flush soma em lote, numa Session própria)
+_pending_hits: Counter = Counter()
+_flush_wakeup = asyncio.Event()
+_flusher: asyncio.Task | None = None
+
+def food_cache_key(name: str, unit: str) -> tuple[tuple[str, str], float]:
+    """
+    Devolve a chave do cache e o fator da unidade pedida em relação à base.
+    Ex: ('Leite', 'litros') -> (('leite', 'ml'), 1000.0)
+    """
+    base_unit, factor = to_base_unit(unit)
+    return (normalize_food_name(name), base_unit), factor
+
+def _count_hits(keys):
+    for key in keys:
+        _pending_hits[key] += 1
+    if sum(_pending_hits.values()) >= settings.FOOD_CACHE_HIT_FLUSH_THRESHOLD:
+        _flush_wakeup.set()
+
+async def flush_food_hits() -> int:
+    """Grava os acertos acumulados em memória com um único UPDATE em lote. Devolve quantas chaves foram gravadas."""
+    if not _pending_hits:
+        return 0
+    hits = dict(_pending_hits)
+    _pending_hits.clear()
+    table = FoodCache.__table__
+    stmt = (
+        update(table)
+        .where(table.c.name == bindparam("b_name"), table.c.unit_type == bindparam("b_unit"))
+        .values(hit_count=table.c.hit_count + bindparam("b_hits"))
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, [
+                {"b_name": name, "b_unit": unit, "b_hits": count} for (name, unit), count in hits.items()
+            ])
+            await db.commit()
+    except Exception:
+        # Devolve para a próxima rodada em vez de perder a contagem
+        _pending_hits.update(hits)
+        raise
+    return len(hits)
+
+async def _flush_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_flush_wakeup.wait(), timeout=settings.FOOD_CACHE_HIT_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _flush_wakeup.clear()
+        try:
+            await flush_food_hits()
+        except Exception as e:
+            print(f"❌ Erro ao gravar hit_count do food_cache: {e}")
+
+def start_food_hit_flusher():
+    global _flusher
+    _flusher = asyncio.create_task(_flush_loop())
+
+async def stop_food_hit_flusher():
+    """Para o flush periódico e grava o que ficou pendente (chamado no shutdown)."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+        _flusher = None
+    try:
+        await flush_food_hits()
+    except Exception as e:
+        print(f"❌ Erro ao gravar hit_count do food_cache: {e}")
+
+async def _select_rows(db: AsyncSession, keys: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+    # Leitura pura: não escreve nem faz commit na Session de quem chamou
+    stmt = (
+        select(FoodCache.name, FoodCache.unit_type, FoodCache.calories_per_unit)
+        .where(tuple_(FoodCache.name, FoodCache.unit_type).in_(keys))
+    )
+    rows = (await db.execute(stmt)).all()
+    return {(name, unit): calories for name, unit, calories in rows}
+
+async def _insert_rows(db: AsyncSession, rows: list[dict]) -> set[tuple[str, str]]:
+    # Se outra requisição salvou o mesmo alimento antes, mantém a linha existente
+    stmt = (
+        insert(FoodCache).values(rows)
+        .on_conflict_do_nothing(index_elements=[FoodCache.name, FoodCache.unit_type])
+        .returning(FoodCache.name, FoodCache.unit_type)
+    )
+    inserted = {(name, unit) for name, unit in (await db.execute(stmt)).all()}
+    await db.commit()
+    return inserted
+
+async def lookup_calories(db: AsyncSession, keys: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+    """Resolve as chaves (ver food_cache_key) primeiro na memória e o resto com uma única query no banco."""
+    found = {}
+    cold = []
+    for key in set(keys):
+        calories = food_hot_cache.get(key)
+        if calories is None:
+            cold.append(key)
+        else:
+            found[key] = calories
+
+    if cold:
+        rows = await _select_rows(db, cold)
+        for key, calories in rows.items():
+            found[key] = calories
+            food_hot_cache.set(key, calories)
+    _count_hits(found)
+    return found
+
+async def store_calories(db: AsyncSession, values: dict[tuple[str, str], float]):
+    rows = [
+        {"name": name, "calories_per_unit": calories, "unit_type": unit}
+        for (name, unit), calories in values.items()
+    ]
+    inserted = await _insert_rows(db, rows)
+    for key, calories in values.items():
+        if key in inserted:
+            food_hot_cache.set(key, calories)
+        else:
+            # A linha já existia com outro valor: a próxima leitura busca o do banco
+            food_hot_cache.delete(key)
+
+async def warm_food_cache(db: AsyncSession) -> int:
+    """Carrega na memória os alimentos mais consultados (chamado no startup)."""
+    rows = (await db.execute(
+        select(FoodCache.name, FoodCache.unit_type, FoodCache.calories_per_unit)
+        .order_by(FoodCache.hit_count.desc())
+        .limit(settings.FOOD_CACHE_WARM_ROWS)
+    )).all()
+    for name, unit, calories in rows:
+        food_hot_cache.set((name, unit), calories)
+    return len(rows)
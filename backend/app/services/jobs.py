@@ -0,0 +1,243 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import meal_plan as crud_meal_plan
+from app.crud.profile import get_profile_by_user_id
+from app.db.session import AsyncSessionLocal
+from app.models.ai_job import AIJob
+from app.models.user import User
+from app.services.meal_plans import create_shopping_list_from_plan, get_or_generate_meal_plan, meal_plan_payload
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed")
+
+class JobFailed(Exception):
+    """Erro definitivo (ex: usuário sem perfil): o job falha sem nova tentativa."""
+
+# Acorda os workers locais quando um job entra na fila (os de outras instâncias acham pelo polling)
+_wakeup = asyncio.Event()
+# Avisa os long-polls locais que algum job terminou
+_job_finished = asyncio.Condition()
+_workers: list[asyncio.Task] = []
+_last_stale_check = 0.0
+
+# --- HANDLERS (um por tipo de job) ---
+
+async def _run_meal_plan(db: AsyncSession, user_id: int, params: dict) -> dict:
+    profile = await get_profile_by_user_id(db, user_id)
+    if not profile:
+        raise JobFailed("Perfil não encontrado.")
+    db_plan = await get_or_generate_meal_plan(
+        db,
+        user_id,
+        profile,
+        days=params.get("days", 1),
+        variety_mode=params.get("variety", "varied"),
+        fresh=params.get("fresh", False),
+        fan_out=params.get("fan_out"),
+    )
+    if not db_plan:
+        raise RuntimeError("Erro ao gerar plano com a IA.")
+    return meal_plan_payload(db_plan)
+
+async def _run_shopping_list(db: AsyncSession, user_id: int, params: dict) -> dict:
+    plan = params.get("plan")
+    if params.get("plan_id") is not None:
+        db_plan = await crud_meal_plan.get_meal_plan(db, params["plan_id"], user_id)
+        if db_plan is None:
+            raise JobFailed("Plano não encontrado.")
+        plan = db_plan.plan
+    db_list = await create_shopping_list_from_plan(db, user_id, plan)
+    if not db_list:
+        raise RuntimeError("Erro ao gerar lista de compras.")
+    return {"list_id": db_list.id, "title": db_list.title, "items": [item.name for item in db_list.items]}
+
+JOB_HANDLERS = {
+    "meal_plan": _run_meal_plan,
+    "shopping_list": _run_shopping_list,
+}
+
+# --- FILA ---
+
+async def enqueue_job(db: AsyncSession, user_id: int, kind: str, params: dict) -> AIJob | None:
+    """Coloca o job na fila. Devolve None se o usuário já tem AI_JOBS_PER_USER jobs ativos."""
+    # Trava a linha do usuário: duas submissões simultâneas não furam o limite
+    await db.execute(select(User.id).where(User.id == user_id).with_for_update())
+    active = await db.scalar(
+        select(func.count()).select_from(AIJob).where(AIJob.user_id == user_id, AIJob.status.in_(ACTIVE_STATUSES))
+    )
+    if active >= settings.AI_JOBS_PER_USER:
+        await db.rollback()
+        return None
+
+    job = AIJob(user_id=user_id, kind=kind, params=params, status="queued")
+    db.add(job)
+    await db.commit()
+    _wakeup.set()
+    return job
+
+async def claim_job(db: AsyncSession) -> AIJob | None:
+    """Pega o job mais antigo da fila. SKIP LOCKED deixa vários workers (e instâncias) disputarem sem bloquear."""
+    next_job = (
+        select(AIJob.id)
+        .where(AIJob.status == "queued")
+        .order_by(AIJob.created_at, AIJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    now = datetime.utcnow()
+    job = await db.scalar(
+        update(AIJob)
+        .where(AIJob.id == next_job)
+        .values(status="running", started_at=now, heartbeat_at=now, attempts=AIJob.attempts + 1)
+        .returning(AIJob)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return job
+
+async def requeue_stale_jobs(db: AsyncSession) -> int:
+    """
+    Job "running" sem heartbeat há tempo demais: o worker que pegou morreu (deploy, crash).
+    Cada claim já conta uma tentativa, então o job que esgotou AI_JOB_MAX_ATTEMPTS falha
+    em vez de voltar para a fila (um job que derruba o worker não fica em loop).
+    """
+    now = datetime.utcnow()
+    stale = (
+        AIJob.status == "running",
+        AIJob.heartbeat_at < now - timedelta(seconds=settings.AI_JOB_STALE_SECONDS),
+    )
+    failed = await db.execute(
+        update(AIJob)
+        .where(*stale, AIJob.attempts >= settings.AI_JOB_MAX_ATTEMPTS)
+        .values(status="failed", error="O worker parou durante o job.", finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    requeued = await db.execute(
+        update(AIJob)
+        .where(*stale)
+        .values(status="queued")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if failed.rowcount:
+        async with _job_finished:
+            _job_finished.notify_all()
+    return requeued.rowcount + failed.rowcount
+
+async def _heartbeat(job_id: int, stop: asyncio.Event):
+    # Session própria: a do job está ocupada com o handler.
+    # Para pelo Event entre um sinal e outro, nunca no meio do UPDATE (não é cancelado)
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.AI_JOB_HEARTBEAT_SECONDS)
+            return
+        except TimeoutError:
+            pass
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(AIJob)
+                    .where(AIJob.id == job_id, AIJob.status == "running")
+                    .values(heartbeat_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"❌ Heartbeat do job {job_id}: {e}")
+
+async def _run_job(db: AsyncSession, job: AIJob):
+    # Copia os campos antes: o rollback expira o objeto e a Session assíncrona não recarrega sozinha
+    job_id, kind, user_id, params, attempts = job.id, job.kind, job.user_id, job.params, job.attempts
+    handler = JOB_HANDLERS.get(kind)
+    stop_heartbeat = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(job_id, stop_heartbeat))
+    try:
+        if handler is None:
+            raise JobFailed(f"Tipo de job desconhecido: {kind}")
+        result = await handler(db, user_id, params)
+        values = {"status": "done", "result": result, "error": None}
+    except JobFailed as e:
+        await db.rollback()
+        values = {"status": "failed", "error": str(e)}
+    except Exception as e:
+        await db.rollback()
+        print(f"❌ Job {job_id} ({kind}) falhou na tentativa {attempts}: {e}")
+        retry = attempts < settings.AI_JOB_MAX_ATTEMPTS
+        values = {"status": "queued" if retry else "failed", "error": str(e)}
+    finally:
+        stop_heartbeat.set()
+        await heartbeat
+
+    if values["status"] in FINISHED_STATUSES:
+        values["finished_at"] = datetime.utcnow()
+    await db.execute(
+        update(AIJob).where(AIJob.id == job_id).values(**values).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    async with _job_finished:
+        _job_finished.notify_all()
+
+async def _worker_loop(number: int):
+    global _last_stale_check
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_job(db)
+                if job is not None:
+                    await _run_job(db, job)
+                    continue
+                if time.monotonic() - _last_stale_check > settings.AI_JOB_STALE_SECONDS / 2:
+                    _last_stale_check = time.monotonic()
+                    await requeue_stale_jobs(db)
+        except asyncio.CancelledError:
+            # Job interrompido no shutdown volta para a fila pelo requeue_stale_jobs
+            raise
+        except Exception as e:
+            print(f"❌ Worker de IA {number}: {e}")
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.AI_JOB_POLL_INTERVAL_SECONDS)
+        except TimeoutError:
+            pass
+        _wakeup.clear()
+
+def start_job_workers():
+    for number in range(settings.AI_JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(number)))
+
+async def stop_job_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+# --- CONSULTA ---
+
+async def get_job(db: AsyncSession, job_id: int, user_id: int) -> AIJob | None:
+    return await db.scalar(select(AIJob).where(AIJob.id == job_id, AIJob.user_id == user_id))
+
+async def wait_for_job(job_id: int, user_id: int, timeout: float) -> AIJob | None:
+    """
+    Long-poll: devolve o job assim que terminar ou quando o tempo acabar.
+    Cada consulta usa uma Session curta para não prender conexão do pool durante a espera.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        async with AsyncSessionLocal() as db:
+            job = await get_job(db, job_id, user_id)
+        remaining = deadline - time.monotonic()
+        if job is None or job.status in FINISHED_STATUSES or remaining <= 0:
+            return job
+        try:
+            async with _job_finished:
+                await asyncio.wait_for(
+                    _job_finished.wait(), timeout=min(remaining, settings.AI_JOB_POLL_INTERVAL_SECONDS)
+                )
+        except TimeoutError:
+            pass
@@ -0,0 +1,77 @@
+import json
+import re
+
+class JsonArrayStreamParser:
+    """
+    Parser incremental para respostas JSON que chegam em pedaços.
+    Procura o array da chave informada (ex: "days") e devolve cada objeto
+    do array assim que ele termina de chegar, sem esperar o JSON inteiro.
+    """
+
+    def __init__(self, key: str):
+        self._key_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._buffer = ""
+        self._pos = 0          # Próximo caractere a ser analisado
+        self._in_array = False
+        self._done = False
+        self._depth = 0        # Profundidade dentro do objeto atual
+        self._start = None     # Início do objeto atual no buffer
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> list:
+        """Adiciona um pedaço de texto e devolve os objetos completos encontrados."""
+        if self._done:
+            return []
+        self._buffer += chunk
+
+        if not self._in_array:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        items = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # Fechou o array da chave: nada mais a extrair
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(json.loads(buffer[self._start:i + 1]))
+                    self._start = None
+
+        # Descarta o que já foi consumido para o buffer não crescer sem limite
+        if self._start is not None:
+            consumed = self._start
+            self._start = 0
+        else:
+            consumed = len(buffer)
+        self._buffer = buffer[consumed:]
+        self._pos = len(self._buffer)
+        return items
@@ -0,0 +1,88 @@
+import asyncio
+import json
+from typing import AsyncIterator
+import httpx
+from app.core.config import settings
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+def _extract_text(data: dict) -> str | None:
+    """Junta os pedaços de texto da primeira resposta do Gemini."""
+    if 'candidates' in data and data['candidates']:
+        parts = data['candidates'][0].get('content', {}).get('parts', [])
+        return "".join(part.get('text', '') for part in parts)
+    return None
+
+class LLMClient:
+    """
+    Cliente assíncrono compartilhado para a IA.
+    Mantém um pool de conexões (keep-alive + HTTP/2) vivo durante toda a aplicação
+    e limita quantas chamadas podem estar em andamento ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=GEMINI_BASE_URL,
+            http2=settings.LLM_HTTP2,
+            headers={"x-goog-api-key": settings.GEMINI_API_KEY},
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.LLM_READ_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+        )
+        self._semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+
+    async def generate(self, prompt: str) -> str | None:
+        """Envia o prompt e devolve o texto bruto da primeira resposta (ou None)."""
+        # Garante o pool mesmo fora do lifespan (ex: TestClient sem context manager)
+        await self.start()
+        payload = { "contents": [{ "parts": [{"text": prompt}] }] }
+
+        async with self._semaphore:
+            response = await self._client.post(f"/{settings.GEMINI_MODEL}:generateContent", json=payload)
+
+        if response.status_code != 200:
+            print(f"❌ Erro Google ({response.status_code}): {response.text}")
+            return None
+
+        return _extract_text(response.json())
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Usa a API de streaming (SSE) e devolve o texto conforme ele é gerado."""
+        await self.start()
+        payload = { "contents": [{ "parts": [{"text": prompt}] }] }
+
+        async with self._semaphore:
+            async with self._client.stream(
+                "POST",
+                f"/{settings.GEMINI_MODEL}:streamGenerateContent",
+                params={"alt": "sse"},
+                json=payload,
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    print(f"❌ Erro Google ({response.status_code}): {body.decode(errors='replace')}")
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    text = _extract_text(json.loads(line[len("data:"):]))
+                    if text:
+                        yield text
+
+llm_client = LLMClient()
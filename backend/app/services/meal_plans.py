@@ -0,0 +1,50 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import meal_plan as crud_meal_plan
+from app.crud import shopping as crud_shopping
+from app.models.meal_plan import MealPlan
+from app.schemas.profile import ProfileResponse
+from app.services.ai import generate_meal_plan, generate_shopping_list_from_plan, meal_plan_prompt_and_key
+
+def meal_plan_payload(db_plan: MealPlan) -> dict:
+    """Formato devolvido pela API: o JSON do plano com o id para reutilizar depois."""
+    return {**db_plan.plan, "plan_id": db_plan.id}
+
+async def get_or_generate_meal_plan(
+    db: AsyncSession,
+    user_id: int,
+    profile: ProfileResponse,
+    days: int = 1,
+    variety_mode: str = "varied",
+    fresh: bool = False,
+    fan_out: bool | None = None,
+) -> MealPlan | None:
+    """
+    Plano salvo do usuário com o mesmo perfil e opções ou, se não houver (ou fresh=True),
+    um plano novo (que ainda pode vir do plan_cache) já persistido.
+    """
+    _, key = meal_plan_prompt_and_key(profile, days, variety_mode)
+    if not fresh:
+        # Mesma validade do plan_cache: depois disso o usuário recebe um plano novo
+        existing = await crud_meal_plan.get_latest_by_key(db, user_id, key, max_age_seconds=settings.PLAN_CACHE_TTL_SECONDS)
+        if existing is not None:
+            return existing
+
+    plan = await generate_meal_plan(profile, days=days, variety_mode=variety_mode, db=db, fresh=fresh, fan_out=fan_out)
+    if not plan:
+        return None
+    return await crud_meal_plan.create_meal_plan(
+        db, user_id=user_id, cache_key=key, days=days, variety=variety_mode, plan=plan
+    )
+
+async def create_shopping_list_from_plan(db: AsyncSession, user_id: int, plan: dict):
+    """Lista de compras a partir do JSON de um plano (ver services/shopping). None se nada foi extraído."""
+    shopping_data = await generate_shopping_list_from_plan(plan)
+    if not shopping_data:
+        return None
+    return await crud_shopping.create_list(
+        db,
+        user_id=user_id,
+        title=shopping_data.get("title", "Lista Automática"),
+        items=[{"name": item_name} for item_name in shopping_data.get("items", [])],
+    )
@@ -0,0 +1,113 @@
+import csv
+from pathlib import Path
+import numpy as np
+from app.services.cache import HitCounter
+from app.services.units import normalize_food_name, to_base_unit
+
+# Tabela de composição local (valores por 100 g, no estilo da TACO)
+FOODS_CSV = Path(__file__).resolve().parent.parent / "data" / "foods.csv"
+NUTRIENTS = ("calories", "protein_g", "carbs_g", "fat_g", "fiber_g")
+
+# Ao simplificar um nome, só estas palavras podem sair do fim: não mudam as calorias.
+# "frito", "doce", "mascavo", "split"... mudam, então o nome cai no food_cache/IA.
+NEUTRAL_DESCRIPTORS = {
+    "grelhado", "grelhada", "cozido", "cozida", "natural", "fresco", "fresca",
+    "picado", "picada", "desfiado", "desfiada", "ralado", "ralada", "fatiado", "fatiada",
+}
+
+nutrient_table_counter = HitCounter("nutrient_table")
+
+class FoodTable:
+    """
+    Tabela em colunas NumPy: uma linha por alimento com os nutrientes por grama
+    e o peso de 1 unidade (NaN quando o alimento não é contado em unidades).
+    """
+
+    def __init__(self, names: list[str], aliases: dict[str, int], per_gram: np.ndarray, unit_grams: np.ndarray):
+        self.names = names
+        self._rows = aliases # nome normalizado (ou apelido) -> linha
+        self.per_gram = per_gram # shape (alimentos, len(NUTRIENTS))
+        self.unit_grams = unit_grams # shape (alimentos,)
+
+    @classmethod
+    def from_csv(cls, path: Path = FOODS_CSV) -> "FoodTable":
+        names, aliases, values, unit_grams = [], {}, [], []
+        with open(path, encoding="utf-8") as file:
+            for row_number, row in enumerate(csv.DictReader(file)):
+                names.append(row["name"])
+                for alias in [row["name"], *row["aliases"].split("|")]:
+                    if alias.strip():
+                        aliases.setdefault(normalize_food_name(alias), row_number)
+                values.append([float(row[nutrient]) for nutrient in NUTRIENTS])
+                unit_grams.append(float(row["unit_grams"]) if row["unit_grams"] else np.nan)
+
+        per_gram = np.asarray(values, dtype=np.float64).reshape(-1, len(NUTRIENTS)) / 100.0
+        return cls(names, aliases, per_gram, np.asarray(unit_grams, dtype=np.float64))
+
+    def find(self, name: str) -> int | None:
+        """
+        Linha do alimento pelo nome ou apelido. Sem achar, tira do fim só descritores neutros
+        ('peito de frango desfiado' -> 'peito de frango'); 'frango frito' não vira 'frango'.
+        """
+        words = normalize_food_name(name).split()
+        while words:
+            row = self._rows.get(" ".join(words))
+            if row is not None:
+                return row
+            if len(words) == 1 or words[-1] not in NEUTRAL_DESCRIPTORS:
+                return None
+            words.pop()
+        return None
+
+    def grams(self, row: int | None, quantity: float, unit: str) -> float:
+        """Converte a quantidade para gramas (ml conta como g). NaN quando não dá para converter."""
+        base_unit, factor = to_base_unit(unit)
+        if base_unit in ("g", "ml"):
+            return quantity * factor
+        if base_unit == "un" and row is not None:
+            return quantity * factor * self.unit_grams[row]
+        return np.nan
+
+    def compute(self, items: list[tuple[str, float, str]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nutrientes de cada item (nome, quantidade, unidade) de uma vez só.
+        Devolve (valores com shape (itens, len(NUTRIENTS)), máscara dos itens resolvidos pela tabela).
+        """
+        rows = [self.find(name) for name, _, _ in items]
+        grams = np.array([self.grams(row, quantity, unit) for row, (_, quantity, unit) in zip(rows, items)], dtype=np.float64)
+        row_index = np.array([-1 if row is None else row for row in rows], dtype=np.int64)
+
+        known = (row_index >= 0) & ~np.isnan(grams)
+        values = np.zeros((len(items), len(NUTRIENTS)), dtype=np.float64)
+        values[known] = self.per_gram[row_index[known]] * grams[known, None]
+        return values, known
+
+    def calories_per_base_unit(self, key: tuple[str, str]) -> float | None:
+        """Kcal por unidade base para uma chave do food_cache (nome normalizado, 'g'/'ml'/'un')."""
+        name, base_unit = key
+        row = self.find(name)
+        if row is None:
+            return None
+        calories = self.grams(row, 1.0, base_unit) * self.per_gram[row, 0]
+        return None if np.isnan(calories) else float(calories)
+
+_table: FoodTable | None = None
+
+def food_table() -> FoodTable:
+    global _table
+    if _table is None:
+        _table = FoodTable.from_csv()
+    return _table
+
+def local_calories(keys: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+    """Resolve pela tabela local as chaves do food_cache que ela conhece."""
+    table = food_table()
+    found = {}
+    for key in set(keys):
+        calories = table.calories_per_base_unit(key)
+        if calories is None:
+            nutrient_table_counter.miss()
+        else:
+            nutrient_table_counter.hit()
+            found[key] = calories
+    return found
@@ -0,0 +1,140 @@
+from collections import Counter, defaultdict
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
+from app.services.cache import TTLCache
+from app.services.units import normalize_food_name
+
+# Palavras que não ajudam a casar ingredientes ("peito de frango" -> {"peito", "frango"})
+STOPWORDS = {"de", "da", "do", "das", "dos", "com", "sem", "e", "em", "a", "o"}
+
+# Itens básicos que todo mundo tem em casa: não contam como ingrediente necessário
+STAPLES = {
+    "sal", "agua", "oleo", "oleo de soja", "azeite", "azeite de oliva",
+    "acucar", "pimenta do reino", "vinagre",
+}
+
+# user_id -> PantryIndex das receitas salvas do usuário
+pantry_cache = TTLCache("pantry_index", settings.PANTRY_INDEX_MAX_ENTRIES, settings.PANTRY_INDEX_TTL_SECONDS)
+
+def food_tokens(name: str) -> frozenset[str]:
+    return frozenset(word for word in normalize_food_name(name).split() if word not in STOPWORDS)
+
+class PantryIndex:
+    """
+    Índice invertido token -> ingredientes das receitas de um usuário.
+    Um item da despensa cobre um ingrediente quando os tokens de um contêm os do outro
+    ("frango" cobre "peito de frango" e "ovos caipira" cobre "ovo").
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, str]]):
+        self._entries: list[tuple[int, frozenset[str], str]] = [] # (recipe_id, tokens, nome original)
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        self._by_recipe: dict[int, list[int]] = defaultdict(list)
+
+        for recipe_id, name in rows:
+            tokens = food_tokens(name)
+            if not tokens or normalize_food_name(name) in STAPLES:
+                continue
+            position = len(self._entries)
+            self._entries.append((recipe_id, tokens, name))
+            self._by_recipe[recipe_id].append(position)
+            for token in tokens:
+                self._postings[token].append(position)
+
+    def __len__(self) -> int:
+        return len(self._by_recipe)
+
+    def match(
+        self, pantry: list[str], min_coverage: float = 0.0, limit: int = 10,
+        min_pantry_coverage: float = 0.0, min_matched: int = 0,
+    ) -> list[dict]:
+        """
+        Receitas ordenadas pela fração dos ingredientes (fora os básicos) que a despensa cobre.
+        pantry_coverage é o outro lado: fração dos itens da despensa que a receita usa. Sem ele,
+        uma receita de um ingrediente só "casaria" 100% com qualquer despensa que o tenha.
+        """
+        items = {food_tokens(item) for item in pantry if normalize_food_name(item) not in STAPLES}
+        items.discard(frozenset())
+
+        covered = set()
+        used_items = Counter() # recipe_id -> itens da despensa que cobrem algo da receita
+        for tokens in items:
+            candidates = set()
+            for token in tokens:
+                candidates.update(self._postings.get(token, ()))
+            recipes = set()
+            for position in candidates:
+                entry_tokens = self._entries[position][1]
+                if tokens <= entry_tokens or entry_tokens <= tokens:
+                    covered.add(position)
+                    recipes.add(self._entries[position][0])
+            used_items.update(recipes)
+
+        have = Counter(self._entries[position][0] for position in covered)
+        ranked = []
+        for recipe_id, count in have.items():
+            coverage = count / len(self._by_recipe[recipe_id])
+            pantry_coverage = used_items[recipe_id] / len(items)
+            if coverage >= min_coverage and pantry_coverage >= min_pantry_coverage and count >= min_matched:
+                ranked.append((-coverage, -count, recipe_id, pantry_coverage))
+        ranked.sort()
+
+        return [
+            {
+                "recipe_id": recipe_id,
+                "coverage": round(-coverage, 3),
+                "pantry_coverage": round(pantry_coverage, 3),
+                "missing": [
+                    self._entries[position][2]
+                    for position in self._by_recipe[recipe_id]
+                    if position not in covered
+                ],
+            }
+            for coverage, _, recipe_id, pantry_coverage in ranked[:limit]
+        ]
+
+async def get_pantry_index(db: AsyncSession, user_id: int) -> PantryIndex:
+    index = pantry_cache.get(user_id)
+    if index is None:
+        result = await db.execute(
+            select(Ingredient.recipe_id, Ingredient.name)
+            .join(Recipe, Recipe.id == Ingredient.recipe_id)
+            .where(Recipe.user_id == user_id)
+        )
+        index = PantryIndex(result.all())
+        pantry_cache.set(user_id, index)
+    return index
+
+def invalidate_pantry(user_id: int):
+    """Chamar sempre que receitas ou ingredientes do usuário mudarem."""
+    pantry_cache.delete(user_id)
+
+async def find_recipes_by_pantry(
+    db: AsyncSession, user_id: int, pantry: list[str], min_coverage: float = 0.0, limit: int = 10,
+    min_pantry_coverage: float = 0.0, min_matched: int = 0,
+) -> list[dict]:
+    """Casa a despensa com as receitas salvas do usuário e devolve as receitas completas, da melhor para a pior."""
+    index = await get_pantry_index(db, user_id)
+    matches = index.match(
+        pantry, min_coverage=min_coverage, limit=limit,
+        min_pantry_coverage=min_pantry_coverage, min_matched=min_matched,
+    )
+    if not matches:
+        return []
+
+    result = await db.execute(
+        select(Recipe)
+        .options(selectinload(Recipe.ingredients))
+        .where(Recipe.id.in_([match["recipe_id"] for match in matches]))
+    )
+    recipes = {recipe.id: recipe for recipe in result.scalars()}
+    return [
+        {**match, "recipe": recipes[match["recipe_id"]]}
+        for match in matches
+        if match["recipe_id"] in recipes
+    ]
@@ -0,0 +1,87 @@
+import copy
+import hashlib
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.plan_cache import PlanCache
+from app.services.cache import TTLCache, HitCounter
+
+# Camada 1: LRU em memória (por processo)
+plan_cache = TTLCache("meal_plans", settings.PLAN_CACHE_MAX_ENTRIES, settings.PLAN_CACHE_TTL_SECONDS)
+# Camada 2 (opcional): tabela plan_cache no Postgres, compartilhada entre workers
+plan_db_counter = HitCounter("meal_plans_db")
+
+def _bucket(value: float | None, step: float):
+    """Arredonda para o 'balde' mais próximo (ex: peso de 1 em 1 kg)."""
+    if value is None:
+        return None
+    bucketed = round(value / step) * step
+    return int(bucketed) if float(step).is_integer() else round(bucketed, 2)
+
+def _normalize_text(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+def _normalize_list(value) -> str:
+    """'Glúten,  lactose' e 'Lactose, glúten' viram a mesma string."""
+    items = {_normalize_text(item) for item in str(value or "").split(",")}
+    return ", ".join(sorted(item for item in items if item))
+
+def normalize_plan_profile(profile) -> dict:
+    """Extrai do perfil só o que entra no prompt, já normalizado e arredondado."""
+    return {
+        "age": int(profile.age),
+        "weight": _bucket(profile.weight, settings.PLAN_CACHE_WEIGHT_BUCKET_KG),
+        "height": _bucket(profile.height, 1),
+        "daily_calories": _bucket(profile.daily_calories or 0, settings.PLAN_CACHE_CALORIES_BUCKET),
+        "goal": _normalize_text(profile.goal),
+        "diet_type": _normalize_text(profile.diet_type),
+        "allergies": _normalize_list(profile.allergies),
+        "food_likes": _normalize_list(profile.food_likes),
+        "food_dislikes": _normalize_list(profile.food_dislikes),
+    }
+
+def plan_cache_key(prompt: str) -> str:
+    """O prompt normalizado é o próprio endereço do conteúdo."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+async def _get_db_plan(db: AsyncSession, key: str) -> dict | None:
+    min_created = datetime.utcnow() - timedelta(seconds=settings.PLAN_CACHE_TTL_SECONDS)
+    result = await db.execute(
+        select(PlanCache.plan).where(PlanCache.key == key, PlanCache.created_at >= min_created)
+    )
+    return result.scalar()
+
+async def _save_db_plan(db: AsyncSession, key: str, plan: dict):
+    stmt = insert(PlanCache).values(key=key, plan=plan, created_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PlanCache.key],
+        set_={"plan": stmt.excluded.plan, "created_at": stmt.excluded.created_at},
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+async def get_cached_plan(key: str, db: AsyncSession | None = None) -> dict | None:
+    plan = plan_cache.get(key)
+
+    if plan is None and db is not None and settings.PLAN_CACHE_DB_ENABLED:
+        plan = await _get_db_plan(db, key)
+        if plan is None:
+            plan_db_counter.miss()
+        else:
+            plan_db_counter.hit()
+            plan_cache.set(key, plan)
+
+    # Cópia para ninguém alterar o objeto guardado no cache
+    return copy.deepcopy(plan) if plan is not None else None
+
+async def save_cached_plan(key: str, plan: dict, db: AsyncSession | None = None):
+    plan_cache.set(key, copy.deepcopy(plan))
+    if db is not None and settings.PLAN_CACHE_DB_ENABLED:
+        try:
+            await _save_db_plan(db, key, plan)
+        except Exception as e:
+            # O cache é só otimização: falha aqui não pode derrubar a geração
+            print(f"❌ Erro ao salvar plano no cache: {e}")
+            await db.rollback()
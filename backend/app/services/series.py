@@ -0,0 +1,63 @@
+from datetime import datetime
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Média móvel simples; os primeiros pontos usam a média do que já existe (janela crescente)."""
+    sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices de `threshold` pontos que preservam o formato da curva.
+    Sempre mantém o primeiro e o último ponto.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Terceiro vértice: média do próximo bucket
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+def build_weight_series(dates: list[datetime], weights: list[float], window: int = 7, points: int | None = None) -> dict:
+    """Média móvel e tendência sobre a série completa; o LTTB só escolhe quais pontos devolver."""
+    if not dates:
+        return {"points": [], "trend": None}
+
+    x = np.array([date.timestamp() for date in dates], dtype=np.float64)
+    y = np.asarray(weights, dtype=np.float64)
+    averages = moving_average(y, window)
+
+    trend = None
+    if len(y) >= 2 and x[-1] > x[0]:
+        slope_per_day = np.polyfit((x - x[0]) / SECONDS_PER_DAY, y, 1)[0]
+        trend = {"kg_per_week": round(float(slope_per_day) * 7, 3), "change_kg": round(float(y[-1] - y[0]), 2)}
+
+    indices = lttb(x, y, points) if points else np.arange(len(y))
+    return {
+        "points": [
+            {"date": dates[i], "weight": round(float(y[i]), 2), "moving_average": round(float(averages[i]), 2)}
+            for i in indices
+        ],
+        "trend": trend,
+    }
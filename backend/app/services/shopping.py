@@ -0,0 +1,169 @@
+import re
+from typing import Any
+from app.services.pantry import STAPLES
+from app.services.units import UNIT_CONVERSIONS, normalize_food_name, normalize_text, normalize_unit, to_base_unit
+
+# Unidades de contagem que não viram gramas ("2 fatias de pão" -> ('pao', 'fatia', 2))
+COUNT_UNITS = {"fatia", "pote", "copo", "lata", "dente", "file", "porcao", "concha", "scoop", "pacote", "caixa", "ramo", "maco"}
+DOZEN_UNITS = {"duzia"}
+
+QUANTITY_WORDS = {
+    "um": 1.0, "uma": 1.0, "dois": 2.0, "duas": 2.0, "tres": 3.0, "quatro": 4.0, "cinco": 5.0,
+    "seis": 6.0, "meio": 0.5, "meia": 0.5,
+}
+
+# Modo de preparo não muda o que se compra ("ovos mexidos" e "ovo cozido" somam juntos)
+PREPARATION_WORDS = {
+    "grelhado", "grelhada", "cozido", "cozida", "mexido", "mexida", "assado", "assada", "refogado", "refogada",
+    "frito", "frita", "cru", "crua", "picado", "picada", "ralado", "ralada", "desfiado", "desfiada",
+    "fatiado", "fatiada", "amassado", "amassada", "natural", "fresco", "fresca", "pequeno", "pequena",
+    "medio", "media", "grande",
+}
+DISH_PREFIXES = ("salada de ", "porcao de ")
+
+# Separadores de itens dentro de uma sugestão ("2 ovos mexidos com 1 fatia de pão e café")
+SPLIT_RE = re.compile(r"\s*(?:[,;+\n]|\be\b|\bcom\b)\s*")
+GLUED_QUANTITY_RE = re.compile(r"^(\d+(?:[.,]\d+)?)([a-z]+)$")
+MAX_NAME_WORDS = 5
+
+def _parse_quantity(token: str) -> float | None:
+    token = token.replace(",", ".")
+    if "/" in token:
+        numerator, _, denominator = token.partition("/")
+        try:
+            return float(numerator) / float(denominator)
+        except (ValueError, ZeroDivisionError):
+            return None
+    try:
+        return float(token)
+    except ValueError:
+        return QUANTITY_WORDS.get(normalize_text(token))
+
+def _match_unit(words: list[str]) -> tuple[str, float, int] | None:
+    """Unidade no começo das palavras: (unidade base, fator, quantas palavras usou)."""
+    for size in (3, 2, 1):
+        if len(words) < size:
+            continue
+        unit = normalize_unit(" ".join(words[:size]))
+        if unit in UNIT_CONVERSIONS:
+            base_unit, factor = to_base_unit(unit)
+            return base_unit, factor, size
+        if size == 1 and unit in COUNT_UNITS:
+            return unit, 1.0, 1
+        if size == 1 and unit in DOZEN_UNITS:
+            return "un", 12.0, 1
+    return None
+
+def split_suggestion(text: str) -> list[str]:
+    """Quebra uma sugestão de refeição em trechos de um item cada (alternativas com 'ou' ficam só com a primeira)."""
+    text = re.sub(r"\([^)]*\)", " ", text)
+    fragments = []
+    for fragment in SPLIT_RE.split(text):
+        fragment = re.split(r"\bou\b", fragment)[0].strip(" .!")
+        if fragment:
+            fragments.append(fragment)
+    return fragments
+
+def parse_item(text: str) -> tuple[tuple[str, str], float | None, str] | None:
+    """
+    '150g de peito de frango grelhado' -> (('peito de frango', 'g'), 150.0, 'Peito de frango').
+    Devolve None quando o trecho não parece um item de compra.
+    """
+    words = text.lower().split()
+    quantity = None
+    if words:
+        glued = GLUED_QUANTITY_RE.match(words[0])
+        if glued:
+            words = [glued.group(1), glued.group(2), *words[1:]]
+        quantity = _parse_quantity(words[0])
+        if quantity is not None:
+            words = words[1:]
+
+    base_unit, factor = "un", 1.0
+    unit = _match_unit(words)
+    if unit:
+        base_unit, factor, size = unit
+        words = words[size:]
+        quantity = quantity if quantity is not None else 1.0
+    if words and normalize_text(words[0]) in ("de", "da", "do", "das", "dos"):
+        words = words[1:]
+
+    raw_name = " ".join(words)
+    for prefix in DISH_PREFIXES:
+        if normalize_text(raw_name).startswith(prefix):
+            words = words[len(prefix.split()):]
+
+    # Mantém as palavras originais (com acento) que sobrevivem ao filtro, para exibir
+    kept = [word for word in words if normalize_food_name(word) not in PREPARATION_WORDS]
+    name = normalize_food_name(" ".join(kept))
+    if not name or len(kept) > MAX_NAME_WORDS or any(char.isdigit() for char in name):
+        return None
+
+    display = " ".join(kept)
+    return (name, base_unit), (quantity * factor if quantity is not None else None), display[:1].upper() + display[1:]
+
+def _collect_lines(data: Any, lines: list, structured: list):
+    # Percorre o plano: sugestões em texto e, se houver, ingredientes estruturados
+    if isinstance(data, dict):
+        if "name" in data and "quantity" in data and "unit" in data:
+            structured.append(data)
+            return
+        for key, value in data.items():
+            if key == "suggestion" and isinstance(value, str):
+                lines.append(value)
+            else:
+                _collect_lines(value, lines, structured)
+    elif isinstance(data, list):
+        for value in data:
+            _collect_lines(value, lines, structured)
+
+def _format_item(key: tuple[str, str], quantity: float | None, display: str) -> str:
+    if quantity is None:
+        return display
+    unit = key[1]
+    if unit == "g" and quantity >= 1000:
+        quantity, unit = quantity / 1000, "kg"
+    elif unit == "ml" and quantity >= 1000:
+        quantity, unit = quantity / 1000, "L"
+    amount = f"{round(quantity, 2):g}"
+    if unit == "un":
+        return f"{amount} {display}"
+    if unit in COUNT_UNITS and quantity > 1:
+        unit += "s"
+    return f"{amount}{unit} de {display}" if unit in ("g", "kg", "ml", "L") else f"{amount} {unit} de {display}"
+
+def consolidate_plan(plan_data: Any) -> tuple[list[str], list[str]]:
+    """
+    Extrai e soma os ingredientes do plano sem IA.
+    Devolve (itens da lista de compras, trechos que não deu para interpretar).
+    """
+    lines, structured = [], []
+    _collect_lines(plan_data, lines, structured)
+
+    parsed = []
+    unparsed = []
+    for ingredient in structured:
+        item = parse_item(f'{ingredient["quantity"]} {ingredient["unit"]} de {ingredient["name"]}')
+        if item is None:
+            unparsed.append(str(ingredient["name"]))
+        else:
+            parsed.append(item)
+    for line in lines:
+        for fragment in split_suggestion(line):
+            item = parse_item(fragment)
+            if item is None:
+                unparsed.append(fragment)
+            else:
+                parsed.append(item)
+
+    # Agregação por (nome normalizado, unidade base), na ordem em que aparecem
+    totals: dict[tuple[str, str], list] = {}
+    for key, quantity, display in parsed:
+        if key[0] in STAPLES:
+            continue
+        entry = totals.setdefault(key, [None, display])
+        if quantity is not None:
+            entry[0] = (entry[0] or 0.0) + quantity
+
+    items = [_format_item(key, quantity, display) for key, (quantity, display) in totals.items()]
+    return items, list(dict.fromkeys(unparsed))
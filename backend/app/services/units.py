@@ -0,0 +1,78 @@
+import re
+import unicodedata
+
+# Palavras que terminam em "s" mas já estão no singular
+SINGULAR_EXCEPTIONS = {"ananas", "lapis", "pires", "onibus", "atlas", "tenis", "gas", "mais", "tres", "seis", "pais"}
+
+# unidade normalizada -> (unidade base, quantos da base cabem em 1 unidade)
+UNIT_CONVERSIONS = {
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "grama": ("g", 1.0),
+    "mg": ("g", 0.001),
+    "kg": ("g", 1000.0),
+    "quilo": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "ml": ("ml", 1.0),
+    "mililitro": ("ml", 1.0),
+    "l": ("ml", 1000.0),
+    "lt": ("ml", 1000.0),
+    "litro": ("ml", 1000.0),
+    # Medidas caseiras (aproximadas em gramas)
+    "colher": ("g", 15.0),
+    "colher de sopa": ("g", 15.0),
+    "cs": ("g", 15.0),
+    "colher de sobremesa": ("g", 10.0),
+    "colher de cha": ("g", 5.0),
+    "cc": ("g", 5.0),
+    "xicara": ("g", 240.0),
+    "xicara de cha": ("g", 240.0),
+    "xic": ("g", 240.0),
+    "un": ("un", 1.0),
+    "und": ("un", 1.0),
+    "unid": ("un", 1.0),
+    "unidade": ("un", 1.0),
+}
+
+def strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def singularize(word: str) -> str:
+    """Regras simples de plural do português (ovos -> ovo, limoes -> limao, colheres -> colher)."""
+    if len(word) <= 3 or word in SINGULAR_EXCEPTIONS or not word.endswith("s"):
+        return word
+    if word.endswith(("oes", "aes")):
+        return word[:-3] + "ao"
+    if word.endswith("aos"):
+        return word[:-1]
+    if word.endswith("ais"):
+        return word[:-2] + "l"
+    if word.endswith("eis"):
+        return word[:-3] + "el"
+    if word.endswith(("res", "zes")):
+        return word[:-2]
+    if word.endswith("ns"):
+        return word[:-2] + "m"
+    return word[:-1]
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acento, sem pontuação e com espaços simples."""
+    text = strip_accents(str(text or "").lower())
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return " ".join(text.split())
+
+def normalize_food_name(name: str) -> str:
+    """'  Ovos  Cozidos' e 'ovo cozido' viram a mesma chave."""
+    return " ".join(singularize(word) for word in normalize_text(name).split())
+
+def normalize_unit(unit: str) -> str:
+    return " ".join(singularize(word) for word in normalize_text(unit).split()) or "un"
+
+def to_base_unit(unit: str) -> tuple[str, float]:
+    """
+    Converte a unidade para a base usada no cache: 'kg' -> ('g', 1000), 'xícara' -> ('g', 240).
+    Unidades desconhecidas viram a própria base com fator 1.
+    """
+    normalized = normalize_unit(unit)
+    return UNIT_CONVERSIONS.get(normalized, (normalized, 1.0))
@@ -17,6 +17,9 @@ from app.models.ingredient import Ingredient
 from app.models.weight_history import WeightHistory
 from app.models.food_cache import FoodCache
 from app.models.shopping import ShoppingList, ShoppingItem
+from app.models.plan_cache import PlanCache
+from app.models.ai_job import AIJob
+from app.models.meal_plan import MealPlan
 
 config = context.config
 
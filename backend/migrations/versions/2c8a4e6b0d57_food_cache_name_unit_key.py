@@ -0,0 +1,123 @@
+"""food_cache_name_unit_key
+
+Revision ID: 2c8a4e6b0d57
+Revises: 9d3e5a7c1f42
+Create Date: 2026-10-18 11:48:09.113205
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8a4e6b0d57'
+down_revision: Union[str, Sequence[str], None] = '9d3e5a7c1f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cópia congelada de app/services/units.py nesta revisão: mudanças futuras na
+# normalização da aplicação não podem alterar o que esta migração faz.
+SINGULAR_EXCEPTIONS = {"ananas", "lapis", "pires", "onibus", "atlas", "tenis", "gas", "mais", "tres", "seis", "pais"}
+
+UNIT_CONVERSIONS = {
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "grama": ("g", 1.0),
+    "mg": ("g", 0.001),
+    "kg": ("g", 1000.0),
+    "quilo": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "ml": ("ml", 1.0),
+    "mililitro": ("ml", 1.0),
+    "l": ("ml", 1000.0),
+    "lt": ("ml", 1000.0),
+    "litro": ("ml", 1000.0),
+    "colher": ("g", 15.0),
+    "colher de sopa": ("g", 15.0),
+    "cs": ("g", 15.0),
+    "colher de sobremesa": ("g", 10.0),
+    "colher de cha": ("g", 5.0),
+    "cc": ("g", 5.0),
+    "xicara": ("g", 240.0),
+    "xicara de cha": ("g", 240.0),
+    "xic": ("g", 240.0),
+    "un": ("un", 1.0),
+    "und": ("un", 1.0),
+    "unid": ("un", 1.0),
+    "unidade": ("un", 1.0),
+}
+
+
+def _singularize(word: str) -> str:
+    if len(word) <= 3 or word in SINGULAR_EXCEPTIONS or not word.endswith("s"):
+        return word
+    if word.endswith(("oes", "aes")):
+        return word[:-3] + "ao"
+    if word.endswith("aos"):
+        return word[:-1]
+    if word.endswith("ais"):
+        return word[:-2] + "l"
+    if word.endswith("eis"):
+        return word[:-3] + "el"
+    if word.endswith(("res", "zes")):
+        return word[:-2]
+    if word.endswith("ns"):
+        return word[:-2] + "m"
+    return word[:-1]
+
+
+def _normalize_words(text: str) -> list[str]:
+    decomposed = unicodedata.normalize("NFKD", str(text or "").lower())
+    text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return [_singularize(word) for word in text.split()]
+
+
+def normalize_food_name(name: str) -> str:
+    return " ".join(_normalize_words(name))
+
+
+def to_base_unit(unit: str) -> tuple[str, float]:
+    normalized = " ".join(_normalize_words(unit)) or "un"
+    return UNIT_CONVERSIONS.get(normalized, (normalized, 1.0))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Converte as linhas antigas (nome + unidade livre) para (nome normalizado, unidade base)
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, name, unit_type, calories_per_unit, hit_count FROM food_cache ORDER BY hit_count DESC, id"
+    )).all()
+
+    seen = set()
+    for row in rows:
+        base_unit, factor = to_base_unit(row.unit_type)
+        key = (normalize_food_name(row.name), base_unit)
+        if key in seen:
+            # Duplicada depois de normalizar: fica a mais usada
+            conn.execute(sa.text("DELETE FROM food_cache WHERE id = :id"), {"id": row.id})
+            continue
+        seen.add(key)
+        conn.execute(
+            sa.text("UPDATE food_cache SET name = :name, unit_type = :unit, calories_per_unit = :calories WHERE id = :id"),
+            {"name": key[0], "unit": key[1], "calories": row.calories_per_unit / factor, "id": row.id},
+        )
+
+    op.drop_index(op.f('ix_food_cache_name'), table_name='food_cache')
+    op.create_unique_constraint('uq_food_cache_name_unit', 'food_cache', ['name', 'unit_type'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_food_cache_name_unit', 'food_cache', type_='unique')
+    # O nome volta a ser único: mantém só uma unidade por alimento
+    op.execute(
+        "DELETE FROM food_cache a USING food_cache b "
+        "WHERE a.name = b.name AND (a.hit_count, a.id) < (b.hit_count, b.id)"
+    )
+    op.create_index(op.f('ix_food_cache_name'), 'food_cache', ['name'], unique=True)
@@ -0,0 +1,96 @@
+"""add_recipe_search
+
+Revision ID: b5e1f3a9c764
+Revises: 3a7d9c1e5b28
+Create Date: 2026-10-18 14:37:40.265113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1f3a9c764'
+down_revision: Union[str, Sequence[str], None] = '3a7d9c1e5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Documento de busca: título (peso A), nomes dos ingredientes (B) e descrição (C)
+SEARCH_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION recipe_search_vector(p_recipe_id integer, p_title text, p_description text)
+RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('portuguese', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('portuguese', coalesce(
+               (SELECT string_agg(name, ' ') FROM ingredients WHERE recipe_id = p_recipe_id), '')), 'B')
+        || setweight(to_tsvector('portuguese', coalesce(p_description, '')), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION recipes_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := recipe_search_vector(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END
+$$;
+
+-- Por statement: um INSERT em lote de ingredientes atualiza cada receita uma vez só
+CREATE OR REPLACE FUNCTION ingredients_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE recipes r
+    SET search_vector = recipe_search_vector(r.id, r.title, r.description)
+    WHERE r.id IN (SELECT recipe_id FROM changed_rows);
+    RETURN NULL;
+END
+$$;
+"""
+
+SEARCH_TRIGGERS = """
+CREATE TRIGGER recipes_search_vector_refresh
+    BEFORE INSERT OR UPDATE OF title, description ON recipes
+    FOR EACH ROW EXECUTE FUNCTION recipes_search_vector_trigger();
+
+CREATE TRIGGER ingredients_search_vector_insert
+    AFTER INSERT ON ingredients REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ingredients_search_vector_trigger();
+
+CREATE TRIGGER ingredients_search_vector_update
+    AFTER UPDATE ON ingredients REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ingredients_search_vector_trigger();
+
+CREATE TRIGGER ingredients_search_vector_delete
+    AFTER DELETE ON ingredients REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ingredients_search_vector_trigger();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('recipes', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_recipes_search_vector', 'recipes', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_recipes_title_trgm', 'recipes', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    # ### end Alembic commands ###
+    op.execute(SEARCH_FUNCTIONS)
+    op.execute(SEARCH_TRIGGERS)
+    # Preenche as receitas que já existem
+    op.execute("UPDATE recipes SET search_vector = recipe_search_vector(id, title, description)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS ingredients_search_vector_delete ON ingredients")
+    op.execute("DROP TRIGGER IF EXISTS ingredients_search_vector_update ON ingredients")
+    op.execute("DROP TRIGGER IF EXISTS ingredients_search_vector_insert ON ingredients")
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_vector_refresh ON recipes")
+    op.execute("DROP FUNCTION IF EXISTS ingredients_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS recipes_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS recipe_search_vector(integer, text, text)")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_recipes_title_trgm', table_name='recipes', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.drop_index('ix_recipes_search_vector', table_name='recipes', postgresql_using='gin')
+    op.drop_column('recipes', 'search_vector')
+    # ### end Alembic commands ###
@@ -0,0 +1,30 @@
+"""add_ai_jobs_heartbeat
+
+Revision ID: d8e1f4a6b203
+Revises: c3f7b2e8d194
+Create Date: 2026-10-18 22:14:05.381927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e1f4a6b203'
+down_revision: Union[str, Sequence[str], None] = 'c3f7b2e8d194'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    # Jobs rodando durante o deploy: o último sinal de vida conhecido é o início
+    op.execute("UPDATE ai_jobs SET heartbeat_at = started_at WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_jobs', 'heartbeat_at')
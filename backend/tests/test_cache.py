@@ -0,0 +1,29 @@
+from app.services.cache import TTLCache
+
+def test_ttl_cache_hit_and_miss():
+    cache = TTLCache("test_hit_miss", max_entries=10, ttl_seconds=60)
+    assert cache.get("plano") is None
+
+    cache.set("plano", {"days": []})
+    assert cache.get("plano") == {"days": []}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("test_lru", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a") # "a" passa a ser o mais recente
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache("test_ttl", max_entries=10, ttl_seconds=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
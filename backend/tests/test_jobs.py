@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from app.db.base import Base
+from app.models.ai_job import AIJob
+from app.models.user import User
+import app.models.profile, app.models.recipe, app.models.ingredient, app.models.shopping, app.models.weight_history, app.models.meal_plan # noqa: F401 (registra os mappers)
+from app.services import jobs
+
+# A fila roda em Postgres; aqui usamos SQLite (JSONB vira JSON)
+compiles(JSONB, "sqlite")(lambda type_, compiler, **kw: "JSON")
+
+def _run(test, tmp_path):
+    async def main():
+        # Arquivo (não :memory: com StaticPool): cada Session usa a própria conexão, como no Postgres
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[User.__table__, AIJob.__table__]
+            ))
+        maker = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+        async with maker() as db:
+            db.add(User(id=1, full_name="Ana", email="a@example.com", hashed_password="x"))
+            await db.commit()
+        try:
+            await test(maker)
+        finally:
+            await engine.dispose()
+    asyncio.run(main())
+
+async def _add_job(db, **values) -> int:
+    job = AIJob(user_id=1, kind="meal_plan", params={}, **values)
+    db.add(job)
+    await db.commit()
+    return job.id
+
+async def _get(maker, job_id: int) -> AIJob:
+    async with maker() as db:
+        return await db.scalar(select(AIJob).where(AIJob.id == job_id))
+
+def test_claim_takes_oldest_queued_job(tmp_path):
+    async def test(maker):
+        async with maker() as db:
+            now = datetime.utcnow()
+            newer = await _add_job(db, status="queued", created_at=now)
+            older = await _add_job(db, status="queued", created_at=now - timedelta(minutes=1))
+            await _add_job(db, status="done", created_at=now - timedelta(minutes=2))
+
+            first = await jobs.claim_job(db)
+            second = await jobs.claim_job(db)
+            assert (first.id, second.id) == (older, newer)
+            assert await jobs.claim_job(db) is None
+
+        claimed = await _get(maker, older)
+        assert claimed.status == "running" and claimed.attempts == 1
+        assert claimed.started_at is not None and claimed.heartbeat_at is not None
+    _run(test, tmp_path)
+
+def test_failed_attempt_is_retried_until_max_attempts(monkeypatch, tmp_path):
+    async def failing(db, user_id, params):
+        raise RuntimeError("IA fora do ar")
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "meal_plan", failing)
+    monkeypatch.setattr(jobs.settings, "AI_JOB_MAX_ATTEMPTS", 2)
+
+    async def test(maker):
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", maker)
+        async with maker() as db:
+            job_id = await _add_job(db, status="queued")
+
+            await jobs._run_job(db, await jobs.claim_job(db))
+            job = await _get(maker, job_id)
+            assert (job.status, job.attempts, job.error) == ("queued", 1, "IA fora do ar")
+
+            await jobs._run_job(db, await jobs.claim_job(db))
+            job = await _get(maker, job_id)
+            assert (job.status, job.attempts) == ("failed", 2)
+            assert job.finished_at is not None
+    _run(test, tmp_path)
+
+def test_job_failed_is_not_retried(monkeypatch, tmp_path):
+    async def no_profile(db, user_id, params):
+        raise jobs.JobFailed("Perfil não encontrado.")
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "meal_plan", no_profile)
+
+    async def test(maker):
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", maker)
+        async with maker() as db:
+            job_id = await _add_job(db, status="queued")
+            await jobs._run_job(db, await jobs.claim_job(db))
+        job = await _get(maker, job_id)
+        assert (job.status, job.attempts, job.error) == ("failed", 1, "Perfil não encontrado.")
+    _run(test, tmp_path)
+
+def test_requeue_stale_jobs_respects_max_attempts(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs.settings, "AI_JOB_MAX_ATTEMPTS", 2)
+
+    async def test(maker):
+        old = datetime.utcnow() - timedelta(seconds=jobs.settings.AI_JOB_STALE_SECONDS + 60)
+        async with maker() as db:
+            retry = await _add_job(db, status="running", attempts=1, started_at=old, heartbeat_at=old)
+            exhausted = await _add_job(db, status="running", attempts=2, started_at=old, heartbeat_at=old)
+            alive = await _add_job(db, status="running", attempts=1, started_at=old, heartbeat_at=datetime.utcnow())
+            assert await jobs.requeue_stale_jobs(db) == 2
+
+        assert (await _get(maker, retry)).status == "queued"
+        job = await _get(maker, exhausted)
+        assert job.status == "failed" and job.finished_at is not None
+        assert (await _get(maker, alive)).status == "running"
+    _run(test, tmp_path)
+
+def test_heartbeat_keeps_long_job_alive(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs.settings, "AI_JOB_HEARTBEAT_SECONDS", 0.01)
+
+    async def test(maker):
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", maker)
+        beats = []
+        async def slow(db, user_id, params):
+            async with maker() as other:
+                beats.append(await other.scalar(select(AIJob.heartbeat_at).where(AIJob.id == job_id)))
+                await asyncio.sleep(0.1)
+                beats.append(await other.scalar(select(AIJob.heartbeat_at).where(AIJob.id == job_id)))
+            return {"ok": True}
+        monkeypatch.setitem(jobs.JOB_HANDLERS, "meal_plan", slow)
+
+        async with maker() as db:
+            job_id = await _add_job(db, status="queued")
+            await jobs._run_job(db, await jobs.claim_job(db))
+        assert beats[1] > beats[0]
+        assert (await _get(maker, job_id)).status == "done"
+    _run(test, tmp_path)
@@ -0,0 +1,47 @@
+import asyncio
+import json
+import pytest
+from app.services import ai
+from app.services.json_stream import JsonArrayStreamParser
+
+PLAN = {
+    "days": [
+        {"day": "Dia 1", "meals": [{"name": "Almoço", "suggestion": "Arroz, feijão e \"bife\" {grelhado}"}]},
+        {"day": "Dia 2", "meals": [{"name": "Jantar", "suggestion": "Sopa [leve]"}]},
+    ]
+}
+
+def test_parser_emits_each_day_as_soon_as_it_closes():
+    text = "```json\n" + json.dumps(PLAN, ensure_ascii=False) + "\n```"
+    parser = JsonArrayStreamParser("days")
+
+    emitted = []
+    for i in range(0, len(text), 7): # Simula os pedaços do streaming
+        emitted.extend(parser.feed(text[i:i + 7]))
+
+    assert emitted == PLAN["days"]
+    assert parser.done
+
+def test_parser_waits_for_complete_object():
+    parser = JsonArrayStreamParser("days")
+    assert parser.feed('{"days": [{"day": "Dia 1", "tip": "beba') == []
+    assert parser.feed(' água"}, {"day"') == [{"day": "Dia 1", "tip": "beba água"}]
+    assert parser.feed(': "Dia 2"}]}') == [{"day": "Dia 2"}]
+
+def _collect_days(monkeypatch, text: str) -> list:
+    async def fake_stream(prompt):
+        for i in range(0, len(text), 7):
+            yield text[i:i + 7]
+    monkeypatch.setattr(ai.llm_client, "stream", fake_stream)
+
+    async def run():
+        return [day async for day in ai.stream_meal_plan_days("prompt")]
+    return asyncio.run(run())
+
+def test_stream_meal_plan_days_emits_complete_plan(monkeypatch):
+    assert _collect_days(monkeypatch, json.dumps(PLAN)) == PLAN["days"]
+
+def test_stream_meal_plan_days_raises_when_truncated(monkeypatch):
+    text = json.dumps(PLAN)
+    with pytest.raises(ValueError):
+        _collect_days(monkeypatch, text[:text.index("Dia 2")])
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import re
+from app.services import ai
+
+PROFILE = {
+    "age": 30, "weight": 80, "height": 180, "daily_calories": 2200, "goal": "perder peso",
+    "diet_type": "onívora", "allergies": "", "food_likes": "frango", "food_dislikes": "fígado",
+}
+
+def _day(suggestion: str) -> str:
+    return json.dumps({"day": "?", "meals": [{"name": "Almoço", "suggestion": suggestion}]})
+
+def _stub(monkeypatch, respond):
+    calls = []
+    async def fake_call_gemini(prompt):
+        calls.append(prompt)
+        return await respond(prompt, calls)
+    monkeypatch.setattr(ai, "call_gemini", fake_call_gemini)
+    return calls
+
+def _day_number(prompt: str) -> int:
+    return int(re.search(r"cardápio do Dia (\d+)", prompt).group(1))
+
+def test_fan_out_keeps_day_order(monkeypatch):
+    async def respond(prompt, calls):
+        number = _day_number(prompt)
+        await asyncio.sleep(0.01 * (4 - number)) # Dias finais terminam primeiro
+        return _day(f"prato {number}")
+    calls = _stub(monkeypatch, respond)
+
+    plan = asyncio.run(ai._generate_meal_plan_fan_out(PROFILE, 3, "varied"))
+
+    assert len(calls) == 3
+    assert [d["day"] for d in plan["days"]] == ["Dia 1", "Dia 2", "Dia 3"]
+    assert [d["meals"][0]["suggestion"] for d in plan["days"]] == ["prato 1", "prato 2", "prato 3"]
+
+def test_fan_out_retries_only_the_failed_day(monkeypatch):
+    async def respond(prompt, calls):
+        number = _day_number(prompt)
+        if number == 2 and sum(_day_number(p) == 2 for p in calls) == 1:
+            return "{ json quebrado"
+        return _day(f"prato {number}")
+    calls = _stub(monkeypatch, respond)
+
+    plan = asyncio.run(ai._generate_meal_plan_fan_out(PROFILE, 3, "varied"))
+
+    assert sorted(_day_number(p) for p in calls) == [1, 2, 2, 3]
+    assert [d["meals"][0]["suggestion"] for d in plan["days"]] == ["prato 1", "prato 2", "prato 3"]
+
+def test_fan_out_gives_up_after_retries(monkeypatch):
+    async def respond(prompt, calls):
+        return None if _day_number(prompt) == 2 else _day("prato")
+    calls = _stub(monkeypatch, respond)
+
+    assert asyncio.run(ai._generate_meal_plan_fan_out(PROFILE, 3, "varied")) is None
+    assert sum(_day_number(p) == 2 for p in calls) == ai.settings.PLAN_DAY_RETRIES + 1
+
+def test_fan_out_repetitive_alternates_template_and_variant(monkeypatch):
+    async def respond(prompt, calls):
+        return _day("marmita A" if len(calls) == 1 else "marmita B")
+    calls = _stub(monkeypatch, respond)
+
+    plan = asyncio.run(ai._generate_meal_plan_fan_out(PROFILE, 5, "repetitive"))
+
+    assert len(calls) == 2
+    assert "marmita A" in calls[1] # A variação parte do dia modelo
+    assert [d["day"] for d in plan["days"]] == [f"Dia {i}" for i in range(1, 6)]
+    assert [d["meals"][0]["suggestion"] for d in plan["days"]] == ["marmita A", "marmita B"] * 2 + ["marmita A"]
@@ -0,0 +1,32 @@
+import numpy as np
+from app.services.nutrients import NUTRIENTS, food_table
+
+def test_find_uses_aliases_and_drops_only_neutral_descriptors():
+    table = food_table()
+    assert table.names[table.find("Ovos")] == "ovo cozido"
+    assert table.names[table.find("peito de frango desfiado")] == "peito de frango grelhado"
+    assert table.names[table.find("batata doce cozida")] == "batata doce cozida"
+    assert table.names[table.find("Frango grelhado desfiado")] == "peito de frango grelhado"
+    assert table.find("frango frito") is None
+    assert table.find("açúcar mascavo") is None
+    assert table.find("banana split") is None
+    assert table.find("leite de coco") is None
+    assert table.find("jaca") is None
+
+def test_compute_converts_units_and_flags_unknown():
+    values, known = food_table().compute([
+        ("ovos", 2, "un"),       # 2 x 50 g
+        ("arroz", 0.1, "kg"),    # 100 g
+        ("leite", 1, "xícara"),  # 240 ml
+        ("jaca", 100, "g"),
+        ("alho", 2, "un"),       # sem peso por unidade
+    ])
+    assert known.tolist() == [True, True, True, False, False]
+    calories = values[:, NUTRIENTS.index("calories")]
+    assert np.allclose(calories, [146, 128, 146.4, 0, 0])
+
+def test_calories_per_base_unit_matches_food_cache_keys():
+    table = food_table()
+    assert table.calories_per_base_unit(("banana", "un")) == 98 * 0.86
+    assert table.calories_per_base_unit(("azeite", "ml")) == 8.84
+    assert table.calories_per_base_unit(("alho", "un")) is None
@@ -0,0 +1,37 @@
+from app.services.pantry import PantryIndex, food_tokens
+
+ROWS = [
+    (1, "Peito de Frango"), (1, "Arroz"), (1, "Sal"),
+    (2, "Ovos"), (2, "Queijo"), (2, "Azeite"),
+    (3, "Leite"), (3, "Chocolate"), (3, "Açúcar"),
+]
+
+def test_food_tokens_ignore_stopwords_and_plural():
+    assert food_tokens("Peito de Frango") == {"peito", "frango"}
+    assert food_tokens("Ovos") == {"ovo"}
+
+def test_match_ranks_by_coverage_and_ignores_staples():
+    index = PantryIndex(ROWS)
+    matches = index.match(["frango", "arroz", "ovo"])
+    assert [m["recipe_id"] for m in matches] == [1, 2]
+    assert matches[0]["coverage"] == 1.0 and matches[0]["missing"] == []
+    assert matches[1]["coverage"] == 0.5 and matches[1]["missing"] == ["Queijo"]
+
+def test_min_coverage_and_limit():
+    index = PantryIndex(ROWS)
+    assert [m["recipe_id"] for m in index.match(["frango", "arroz", "ovo"], min_coverage=1.0)] == [1]
+    assert len(index.match(["frango", "ovo", "leite"], limit=2)) == 2
+    assert index.match(["banana"]) == []
+
+def test_pantry_coverage_and_min_matched():
+    index = PantryIndex(ROWS + [(4, "Ovo"), (4, "Sal")])
+    pantry = ["ovos", "frango", "arroz", "tomate", "sal"]
+    matches = {m["recipe_id"]: m for m in index.match(pantry)}
+    # "sal" é básico e não entra na conta: 4 itens na despensa
+    assert matches[1]["pantry_coverage"] == 0.5
+    assert matches[4]["coverage"] == 1.0 and matches[4]["pantry_coverage"] == 0.25
+
+    # Receita de um ingrediente só não passa por "completa" com qualquer despensa
+    strict = index.match(pantry, min_coverage=1.0, min_pantry_coverage=0.5, min_matched=2)
+    assert [m["recipe_id"] for m in strict] == [1]
+    assert index.match(["ovos"], min_coverage=1.0, min_matched=2) == []
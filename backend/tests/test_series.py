@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+import numpy as np
+from app.services.series import build_weight_series, lttb, moving_average
+
+def test_moving_average_grows_window_at_start():
+    assert np.allclose(moving_average(np.array([1.0, 2.0, 3.0, 4.0]), 2), [1.0, 1.5, 2.5, 3.5])
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[37] = 10.0
+    selected = lttb(x, y, 10)
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99 and 37 in selected
+    assert np.all(np.diff(selected) > 0)
+    assert len(lttb(x, y, 200)) == 100
+
+def test_build_weight_series_trend():
+    start = datetime(2026, 1, 1)
+    dates = [start + timedelta(days=i) for i in range(30)]
+    weights = [80 - 0.1 * i for i in range(30)]
+    series = build_weight_series(dates, weights, window=7, points=10)
+    assert len(series["points"]) == 10
+    assert series["points"][0]["date"] == start
+    assert series["trend"] == {"kg_per_week": -0.7, "change_kg": -2.9}
+    assert build_weight_series([], []) == {"points": [], "trend": None}
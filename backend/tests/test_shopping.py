@@ -0,0 +1,30 @@
+from app.services.shopping import consolidate_plan, parse_item, split_suggestion
+
+def test_split_suggestion():
+    assert split_suggestion("2 ovos mexidos com 1 fatia de pão integral e café (sem açúcar)") == [
+        "2 ovos mexidos", "1 fatia de pão integral", "café",
+    ]
+    assert split_suggestion("Tapioca ou cuscuz, suco de laranja") == ["Tapioca", "suco de laranja"]
+
+def test_parse_item_units_and_names():
+    assert parse_item("150g de peito de frango grelhado") == (("peito de frango", "g"), 150.0, "Peito de frango")
+    assert parse_item("1 colher de sopa de azeite") == (("azeite", "g"), 15.0, "Azeite")
+    assert parse_item("meia dúzia de ovos") == (("ovo", "un"), 6.0, "Ovos")
+    assert parse_item("salada de alface") == (("alface", "un"), None, "Alface")
+    assert parse_item("um prato bem servido de legumes variados da estação") is None
+
+def test_consolidate_plan_sums_across_meals_and_days():
+    plan = {"days": [
+        {"meals": [
+            {"name": "Café", "suggestion": "2 ovos mexidos com 1 fatia de pão integral"},
+            {"name": "Almoço", "suggestion": "150g de peito de frango grelhado, 100g de arroz e salada de alface"},
+        ]},
+        {"meals": [
+            {"name": "Café", "suggestion": "3 ovos cozidos e 2 fatias de pão integral"},
+            {"name": "Jantar", "suggestion": "850 g de peito de frango desfiado com sal"},
+            {"name": "Ceia", "suggestion": "Refeição livre à sua escolha dentro da meta"},
+        ]},
+    ]}
+    items, unparsed = consolidate_plan(plan)
+    assert items == ["5 Ovos", "3 fatias de Pão integral", "1kg de Peito de frango", "100g de Arroz", "Alface"]
+    assert unparsed == ["Refeição livre à sua escolha dentro da meta"]
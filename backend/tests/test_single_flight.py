@@ -0,0 +1,48 @@
+import asyncio
+from app.services import ai
+
+def _stub_upstream(monkeypatch):
+    calls = []
+    release = asyncio.Event()
+    async def fake_call_gemini(prompt):
+        calls.append(prompt)
+        await release.wait()
+        return f"resposta para {prompt}"
+    monkeypatch.setattr(ai, "_call_gemini", fake_call_gemini)
+    return calls, release
+
+def test_identical_prompts_share_one_upstream_call(monkeypatch):
+    async def run():
+        calls, release = _stub_upstream(monkeypatch)
+        waiters = [asyncio.create_task(ai.call_gemini("mesmo prompt")) for _ in range(5)]
+        other = asyncio.create_task(ai.call_gemini("outro prompt"))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, other)
+        return calls, results
+
+    calls, results = asyncio.run(run())
+
+    assert sorted(calls) == ["mesmo prompt", "outro prompt"]
+    assert results == ["resposta para mesmo prompt"] * 5 + ["resposta para outro prompt"]
+    assert ai._inflight == {}
+
+def test_cancelling_one_waiter_keeps_the_shared_call(monkeypatch):
+    async def run():
+        calls, release = _stub_upstream(monkeypatch)
+        first = asyncio.create_task(ai.call_gemini("mesmo prompt"))
+        second = asyncio.create_task(ai.call_gemini("mesmo prompt"))
+        await asyncio.sleep(0)
+
+        first.cancel() # Quem abriu a chamada desconecta
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert not ai._inflight["mesmo prompt"].cancelled()
+
+        release.set()
+        return calls, await second
+
+    calls, result = asyncio.run(run())
+
+    assert calls == ["mesmo prompt"]
+    assert result == "resposta para mesmo prompt"
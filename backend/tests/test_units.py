@@ -0,0 +1,18 @@
+from app.services.units import normalize_food_name, to_base_unit
+
+def test_normalize_food_name_handles_accents_spaces_and_plurals():
+    assert normalize_food_name("  Ovos   Cozidos ") == "ovo cozido"
+    assert normalize_food_name("Limões") == normalize_food_name("limão")
+    assert normalize_food_name("Pães") == "pao"
+    assert normalize_food_name("Feijão") == "feijao"
+    assert normalize_food_name("arroz") == "arroz"
+
+def test_to_base_unit_converts_to_grams_and_ml():
+    assert to_base_unit("kg") == ("g", 1000.0)
+    assert to_base_unit("Litros") == ("ml", 1000.0)
+    assert to_base_unit("xícaras") == ("g", 240.0)
+    assert to_base_unit("Colheres de sopa") == ("g", 15.0)
+    assert to_base_unit("unidades") == ("un", 1.0)
+
+def test_to_base_unit_keeps_unknown_units():
+    assert to_base_unit("Fatias") == ("fatia", 1.0)
@@ -13,4 +13,11 @@ api.interceptors.request.use((config) => {
   }
   
   return config;
-});
\ No newline at end of file
+});
+
+// Listas paginadas por cursor: devolve uma página e o cursor da próxima (header X-Next-Cursor)
+export async function getPage<T>(url: string, params: Record<string, unknown> = {}): Promise<{ data: T[]; nextCursor?: string }> {
+  const res = await api.get<T[]>(url, { params });
+  const next = res.headers['x-next-cursor'];
+  return { data: res.data, nextCursor: typeof next === 'string' ? next : undefined };
+}
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { api } from '../lib/api';
+import { api, getPage } from '../lib/api';
 import type { ShoppingList } from '../types';
 import { Plus, Trash2, Calendar, CheckCircle, Circle, ShoppingCart, Loader2 , ArrowLeft } from 'lucide-react';
 import { format } from 'date-fns';
@@ -9,14 +9,17 @@ export function ShoppingPage() {
   const navigate = useNavigate();
   const [lists, setLists] = useState<ShoppingList[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string>();
+  const [loadingMore, setLoadingMore] = useState(false);
   const [newListTitle, setNewListTitle] = useState('');
   const [newItemNames, setNewItemNames] = useState<Record<number, string>>({}); // Estado por lista
 
-  // Carregar listas
+  // Carregar listas (uma página por vez; as próximas vêm pelo botão "Carregar mais")
   async function loadLists() {
     try {
-      const res = await api.get('/shopping/');
-      setLists(res.data);
+      const page = await getPage<ShoppingList>('/shopping/');
+      setLists(page.data);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error(error);
     } finally {
@@ -24,6 +27,20 @@ export function ShoppingPage() {
     }
   }
 
+  async function loadMoreLists() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage<ShoppingList>('/shopping/', { cursor: nextCursor });
+      setLists(current => [...current, ...page.data]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   useEffect(() => { loadLists(); }, []);
 
   // Criar Lista
@@ -177,6 +194,12 @@ export function ShoppingPage() {
               </div>
             </div>
           ))}
+
+          {nextCursor && (
+            <button onClick={loadMoreLists} disabled={loadingMore} className="w-full py-3 rounded-xl border border-zinc-200 dark:border-zinc-800 text-pink-500 hover:bg-zinc-50 dark:hover:bg-zinc-900 font-bold flex justify-center items-center gap-2">
+              {loadingMore ? <Loader2 className="animate-spin h-5 w-5" /> : 'Carregar mais'}
+            </button>
+          )}
         </div>
       )}
     </div>